@@ -4,16 +4,26 @@ Print show Python sample codes.
 
 """
 
-import inspect
-import itertools
-import os
-import pydoc
-import sys
+import contextlib
+import json
 
-import pyhow.samples
+from pyhow.cache import (
+    cached_extract_sample, load_page, page_key, page_writer)
+from pyhow.extract import group_by_category, select_functions
+from pyhow.pager import default_style, open_pager, open_stdout
+from pyhow.registry import (
+    load_sample, make_samples, sample, sample_filename)
+from pyhow.style import OVERSTRIKE, STYLES
 
 
-_CATEGORY_TAG = "# category: "
+__all__ = [
+    'load_sample', 'make_samples', 'render_page', 'render_records',
+    'render_sample', 'run_record', 'sample', 'sample_filename',
+    'show_sample']
+
+TEXT = 'text'
+NDJSON = 'ndjson'
+OUTPUTS = (TEXT, NDJSON)
 
 _TEMPLATE_PREFIX = """
 >>> {module_doc}
@@ -24,109 +34,257 @@ _TEMPLATE_PREFIX = """
 _CATEGORY_TEMPLATE = """{step} {category}
 
 
-{methods}
 """
 
+_CATEGORY_END = "\n"
+
 _STEP_TEMPLATE = "{current_category}/{nb_categories}"
 
 _METHOD_TEMPLATE = """  {method_upper}: {doc}
     |
 {codelines}
     |
-    |-- {method}() = {result!r}
-
+    |-- {method}() = {result}
+{report}
 
 """
 
 _CODELINE_TEMPLATE = "    |  {codeline}"
 
+_REPORT_TEMPLATE = "    |   {line}\n"
 
-def make_samples():
-    """Prepare sample modules."""
-
-    root = 'pyhow.samples.'
-    return {
-        name[len(root):]: module for name, module in sys.modules.items() if (
-            name.startswith(root) and
-            not os.path.basename(module.__file__).startswith('_'))
-    }
+_GATHER_TEMPLATE = """  {size} coroutines awaited together in {wall:.1f} ms, \
+{total:.1f} ms of summed durations
 
 
-def _bold(text):
-    """Format a string in bold by overstriking."""
-    return ''.join(ch + '\b' + ch for ch in text)
+"""
 
 
-def _underline(text):
-    """Format a string by overstriking."""
-    return ''.join('_' + '\b' + ch for ch in text)
+def _render_method(method_info, run, style):
+    """Format a sample function, its code and its result."""
 
+    # pylint: disable=import-outside-toplevel
+    # the runner and the probes are only loaded when functions are run
+    from pyhow.probes import format_measures
+    from pyhow.runner import format_result
 
-def _extract_methods_info(module):
-    """Extract methods data from a given python modules."""
+    codelines_text = ''
+    for line in method_info['codelines']:
+        codelines_text += _CODELINE_TEMPLATE.format(codeline=line)
 
-    categories = [('uncategorized', -1)]
-    categories += [
-        (line.strip().replace(_CATEGORY_TAG, ''), line_number)
-        for line_number, line in enumerate(inspect.getsourcelines(module)[0])
-        if line.strip().startswith(_CATEGORY_TAG)]
+    return _METHOD_TEMPLATE.format(
+        method_upper=style.bold(method_info['name'].upper()),
+        method=style.bold(method_info['name']),
+        doc=style.bold(method_info['doc']),
+        result=format_result(run),
+        report=''.join(
+            _REPORT_TEMPLATE.format(line=line)
+            for line in format_measures(run.get('measures', {}))),
+        codelines=codelines_text.rstrip())
 
-    methods = [getattr(module, name) for name in dir(module)]
-    methods = [method for method in methods if (
-        callable(method) and hasattr(method, '__module__') and
-        method.__module__ == module.__name__ and method.__name__ != 'run')]
-    methods_info = []
-    for method in methods:
-        codelines, line_number = inspect.getsourcelines(method)
-        methods_info.append({
-            'name': method.__name__,
-            'doc': method.__doc__.strip() if method.__doc__ else '',
-            'codelines': [
-                line for line in codelines if line.strip() and
-                '"""' not in line],
-            'method': method,
-            'category': [
-                category_name for category_name, category_line_number in
-                categories if line_number > category_line_number][-1],
-        })
-    return methods_info
 
+def _render_parts(sample_data, style):
+    """Lay out a sample module page, without running any function.
 
-def show_sample(module):
-    """Print sample modules."""
+    Sample functions are left as {'run': name} parts, to be replaced by
+    the function rendering once it has been run.
 
-    methods_info = _extract_methods_info(module)
-    methods_info = sorted(methods_info, key=lambda x: x['name'])
-    methods_info = sorted(methods_info, key=lambda x: x['category'])
+    """
 
-    grouped_catergories = itertools.groupby(
-        methods_info, key=lambda x: x['category'])
+    grouped_catergories = group_by_category(sample_data['functions'])
 
-    text = _TEMPLATE_PREFIX.format(module_doc=_bold(module.__doc__.upper()))
-    nb_categories = len(set(
-        method_info['category'] for method_info in methods_info))
+    parts = [_TEMPLATE_PREFIX.format(
+        module_doc=style.bold(sample_data['doc'].upper()))]
+    nb_categories = len(grouped_catergories)
     for current_category, (category_name, category_methods_info) in enumerate(
             grouped_catergories):
 
-        methods_text = ''
-        for method_info in category_methods_info:
+        parts.append(_CATEGORY_TEMPLATE.format(
+            step=style.bold(_STEP_TEMPLATE.format(
+                current_category=current_category+1,
+                nb_categories=nb_categories)),
+            category=style.underline(category_name.upper())))
+        parts.extend(
+            {'run': method_info['name']}
+            for method_info in category_methods_info)
+        parts.append(_CATEGORY_END)
+
+    return parts
+
+
+def _load_sample_data(name, use_cache, selection, categories):
+    """Extracted data of a sample, only with the selected functions."""
+
+    sample_data = cached_extract_sample(sample_filename(name), use_cache)
+    if selection is not None or categories is not None:
+        sample_data = dict(sample_data, functions=select_functions(
+            sample_data['functions'], selection, categories))
+    return sample_data
+
+
+def _run_functions(*args, profiles=None):
+    """Run sample functions, loading the runner on the first run only.
+
+    Pages read from the cache with no function left to run never import
+    the runner, its process pools nor its probes. The pstats files saved
+    by the profile probe are appended to the profiles list, when given.
+
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from pyhow.runner import run_functions
+    for run in run_functions(*args):
+        if profiles is not None and 'profile' in run.get('measures', {}):
+            profiles.append(run['measures']['profile']['filename'])
+        yield run
+
+
+def render_page(sample_data, runs, style=OVERSTRIKE):
+    """Render a sample module page from its function runs, by chunks."""
+
+    methods_info = {
+        method_info['name']: method_info
+        for method_info in sample_data['functions']}
+    for part in _render_parts(sample_data, STYLES[style]):
+        if isinstance(part, dict):
+            yield _render_method(
+                methods_info[part['run']], runs[part['run']], STYLES[style])
+        else:
+            yield part
+
+
+def render_sample(
+        name, use_cache=True, jobs=1, sandbox=None, style=OVERSTRIKE,
+        probes=None, selection=None, categories=None, executor=None,
+        profiles=None):
+    """Render a sample module page, yield it chunk by chunk.
+
+    selection and categories, when given, list glob patterns of the
+    function names and prefixes of the categories to show. The other
+    functions are never called. profiles, when given, is a list extended
+    with the pstats files saved by the profile probe.
+
+    Cached pages only keep nondeterministic functions, and functions
+    stopped by the sandbox, as {'run': name} parts. The other parts are
+    stored already rendered. Pages with probe measures are not cached.
+    Coroutine functions awaited together by this call end the page with
+    their wall time and the sum of their durations.
+
+    """
+
+    sample_data = _load_sample_data(name, use_cache, selection, categories)
+    methods_info = {
+        method_info['name']: method_info
+        for method_info in sample_data['functions']}
+    key = page_key(sample_data, options={
+        'style': style, 'selection': selection, 'categories': categories})
+
+    use_page_cache = use_cache and not probes
+    parts = load_page(key) if use_page_cache else None
+    page_cached = parts is not None
+    if not page_cached:
+        parts = _render_parts(sample_data, STYLES[style])
+
+    function_names = [part['run'] for part in parts if isinstance(part, dict)]
+    runs = _run_functions(
+        name, sample_data, function_names, use_cache, jobs, sandbox, probes,
+        executor, profiles=profiles)
+
+    with contextlib.ExitStack() as stack:
+        store_part = lambda part: None
+        if use_page_cache and not page_cached:
+            store_part = stack.enter_context(page_writer(key))
+
+        gathered = []
+        for part in parts:
+            if isinstance(part, dict):
+                # pylint: disable=import-outside-toplevel
+                from pyhow.runner import ERROR, OK
+                method_info = methods_info[part['run']]
+                run = next(runs)
+                if 'gather' in run:
+                    gathered.append(run)
+                rendered = _render_method(method_info, run, STYLES[style])
+                store_part(rendered if (
+                    method_info['deterministic'] and
+                    run['status'] in (OK, ERROR)) else part)
+                yield rendered
+            else:
+                store_part(part)
+                yield part
+
+    if gathered:
+        yield _GATHER_TEMPLATE.format(
+            size=len(gathered), wall=gathered[0]['gather']['wall'] * 1000,
+            total=sum(run['duration'] for run in gathered) * 1000)
+
+
+def run_record(name, function, run):
+    """Describe a sample function and its run as a JSON object."""
+
+    return {
+        'module': name,
+        'category': function['category'],
+        'name': function['name'],
+        'doc': function['doc'],
+        'codelines': function['codelines'],
+        'cost': function['cost'],
+        'tags': function['tags'],
+        'status': run['status'],
+        'result': run.get('result'),
+        'error': run.get('error'),
+        'duration': run['duration'],
+        'cached': run.get('cached', False),
+        'exception': run.get('exception'),
+        'measures': run.get('measures'),
+        'gather': run.get('gather'),
+    }
+
 
-            codelines_text = ''
-            for line in method_info['codelines']:
-                codelines_text += _CODELINE_TEMPLATE.format(codeline=line)
+def render_records(
+        name, use_cache=True, jobs=1, sandbox=None, probes=None,
+        selection=None, categories=None, executor=None, profiles=None):
+    """Run a sample module, yield one JSON line per function run.
 
-            methods_text += _METHOD_TEMPLATE.format(
-                method_upper=_bold(method_info['name'].upper()),
-                method=_bold(method_info['name']),
-                doc=_bold(method_info['doc']),
-                result=method_info['method'](),
-                codelines=codelines_text.rstrip())
+    Options are the render_sample() ones.
 
-        text += _CATEGORY_TEMPLATE.format(
-            step=_bold(_STEP_TEMPLATE.format(
-                current_category=current_category+1,
-                nb_categories=nb_categories)),
-            category=_underline(category_name.upper()),
-            methods=methods_text)
+    """
+
+    sample_data = _load_sample_data(name, use_cache, selection, categories)
+    functions = [
+        function for _, category_functions in group_by_category(
+            sample_data['functions'])
+        for function in category_functions]
+    runs = _run_functions(
+        name, sample_data, [function['name'] for function in functions],
+        use_cache, jobs, sandbox, probes, executor, profiles=profiles)
+
+    for function, run in zip(functions, runs):
+        yield json.dumps(run_record(name, function, run)) + '\n'
+
+
+def show_sample(
+        name, use_cache=True, jobs=1, sandbox=None, style=None, probes=None,
+        output=TEXT, selection=None, categories=None, profiles=None):
+    """Print sample modules, in a style fitting the output by default.
+
+    With the NDJSON output, function runs are written to the standard
+    output as soon as they are known, one JSON object per line. The
+    profiles list is extended as in render_sample().
+
+    """
+
+    options = {
+        'use_cache': use_cache, 'jobs': jobs, 'sandbox': sandbox,
+        'probes': probes, 'selection': selection, 'categories': categories,
+        'profiles': profiles}
+    if output == NDJSON:
+        with open_stdout() as write:
+            for record in render_records(name, **options):
+                write(record)
+        return
 
-    pydoc.getpager()(text)
+    with open_pager() as write:
+        for chunk in render_sample(
+                name, style=style or default_style(), **options):
+            write(chunk)
@@ -1,32 +1,371 @@
 """Run pyhow."""
 
 import argparse
+import os
+import sys
 
-from pyhow import make_samples, show_sample
+from pyhow import OUTPUTS, TEXT, show_sample
+from pyhow.client import (
+    InvalidRequest, ServerError, connect, default_socket, show_served)
+from pyhow.manifest import check_address, load_manifest
+from pyhow.pager import open_stdout
+from pyhow.registry import parse_address, sample_module_name
+from pyhow.style import ANSI, PLAIN, STYLES
+
+# Commands import their modules when called: help, argument errors and
+# cached pages never load the servers, the runner nor the probes.
+# pylint: disable=import-outside-toplevel
 
 
 DESCRIPTION_PREFIX = "Select one of the following samples:"
 
+COMMANDS_PREFIX = "Or run one of the following commands:"
+
+
+def cache_command(argv):
+    """Manage cached sample data."""
+
+    from pyhow.cache import clear_cache
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow cache', description=cache_command.__doc__)
+    parser.add_argument(
+        'action', choices=['clear'], help="clear: remove all cached files")
+    parser.parse_args(argv)
+
+    print("{} cached files removed".format(clear_cache()))
+    return 0
+
+
+def selfbench_command(argv):
+    """Benchmark pyhow itself, stage by stage."""
+
+    from pyhow.selfbench import (
+        compare_selfbench, load_baseline, run_selfbench, save_baseline)
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow selfbench', description=selfbench_command.__doc__)
+    parser.add_argument(
+        '--repeat', type=int, default=5, metavar='N',
+        help="timing repetitions, the best one is kept (default: 5)")
+    parser.add_argument(
+        '--save', metavar='FILE', help="save the timings as a baseline")
+    parser.add_argument(
+        '--compare', metavar='FILE', help="compare with a saved baseline")
+    parser.add_argument(
+        '--threshold', type=float, default=10, metavar='PERCENT',
+        help="slowdown reported as a regression (default: 10)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError) as error:
+            parser.error("cannot load baseline {}: {}".format(
+                args.compare, error))
+    results = run_selfbench(args.repeat)
+    for stage, timings in sorted(results['stages'].items()):
+        print("{:<16}{:>10.3f} ms".format(
+            stage, sum(timings.values()) * 1000))
+    if args.save:
+        save_baseline(args.save, results)
+    if baseline is None:
+        return 0
+
+    if baseline['python'] != results['python']:
+        print("warning: baseline made with Python {}".format(
+            baseline['python'].split()[0]))
+    regressions = compare_selfbench(
+        baseline, results, args.threshold / 100)
+    for stage, sample, baseline_timing, timing in regressions:
+        print("regression: {} {}: {:.3f} ms -> {:.3f} ms (+{:.0f}%)".format(
+            stage, sample, baseline_timing * 1000, timing * 1000,
+            (timing / baseline_timing - 1) * 100))
+    return 1 if regressions else 0
+
+
+def export_command(argv):
+    """Export all samples to a documentation tree."""
+
+    from pyhow.export import EXPORT_FORMATS, export_samples
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow export', description=export_command.__doc__)
+    parser.add_argument(
+        '--format', choices=sorted(EXPORT_FORMATS), default='md',
+        help="exported files format (default: md)")
+    parser.add_argument(
+        '--out', required=True, metavar='DIR', help="output directory")
+    parser.add_argument(
+        '--jobs', type=int, default=None, metavar='N',
+        help="worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    written = export_samples(args.out, args.format, args.jobs)
+    print("{} files written to {}".format(len(written), args.out))
+    return 0
+
+
+def search_command(argv):
+    """Find sample functions by words."""
+
+    from pyhow.search import load_index, search
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow search', description=search_command.__doc__)
+    parser.add_argument('terms', nargs='+', metavar='term')
+    parser.add_argument(
+        '--limit', type=int, default=10, metavar='N',
+        help="maximum number of results (default: 10)")
+    args = parser.parse_args(argv)
+
+    results = search(load_index(), args.terms, args.limit)
+    space = max([len(address) for _, address, _ in results] or [0])
+    for score, address, doc in results:
+        print("{:6.1f}  {:<{}}  {}".format(score, address, space, doc))
+    return 0 if results else 1
+
+
+def serve_command(argv):
+    """Serve samples to the command line from a preloaded process."""
+
+    from pyhow.server import serve
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow serve', description=serve_command.__doc__)
+    parser.add_argument(
+        '--socket', default=default_socket(), metavar='PATH',
+        help="Unix socket path (default: {})".format(default_socket()))
+    parser.add_argument(
+        '--jobs', type=int, default=None, metavar='N',
+        help="worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    print("serving samples on {}".format(args.socket), file=sys.stderr)
+    try:
+        serve(args.socket, args.jobs)
+    except ServerError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def http_command(argv):
+    """Serve sample pages over HTTP."""
+
+    from pyhow.web import serve_http
+
+    parser = argparse.ArgumentParser(
+        prog='pyhow http', description=http_command.__doc__)
+    parser.add_argument(
+        '--host', default='localhost',
+        help="bound address (default: localhost)")
+    parser.add_argument(
+        '--port', type=int, default=8000, metavar='N',
+        help="listened port (default: 8000)")
+    parser.add_argument(
+        '--jobs', type=int, default=None, metavar='N',
+        help="worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    print("serving samples on http://{}:{}/".format(args.host, args.port),
+          file=sys.stderr)
+    try:
+        serve_http(args.host, args.port, args.jobs)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def watch_command(argv):
+    """Render a sample again each time its file changes."""
+
+    from pyhow.watch import watch_sample
+
+    samples = load_manifest()
+    parser = argparse.ArgumentParser(
+        prog='pyhow watch', description=watch_command.__doc__)
+    parser.add_argument(
+        'address', metavar='sample_name[:function]',
+        help="a sample name, optionally followed by a function name or glob")
+    parser.add_argument(
+        '--style', choices=['auto'] + list(STYLES), default='auto',
+        help="text style, auto fits the output (default: auto)")
+    parser.add_argument(
+        '--interval', type=float, default=1, metavar='SECONDS',
+        help="file polling interval (default: 1)")
+    args = parser.parse_args(argv)
+
+    name, pattern = parse_address(args.address)
+    if name not in samples:
+        parser.error("unknown sample {!r}, choose from {}".format(
+            name, ', '.join(sorted(samples))))
+    style = args.style
+    if style == 'auto':
+        style = ANSI if sys.stdout.isatty() else PLAIN
+    with open_stdout() as write:
+        try:
+            watch_sample(
+                name, write, style, None if pattern is None else [pattern],
+                args.interval)
+        except KeyboardInterrupt:
+            pass
+    return 0
 
-def main():
-    """Parse command line and show the required sample."""
 
-    samples = make_samples()
-    space = max(len(name) for name in samples)
+COMMANDS = {
+    'cache': cache_command,
+    'export': export_command,
+    'http': http_command,
+    'search': search_command,
+    'selfbench': selfbench_command,
+    'serve': serve_command,
+    'watch': watch_command,
+}
+
+
+def _describe_samples(samples):
+    """Help description listing the samples and the commands."""
+
+    space = max(len(name) for name in list(samples) + list(COMMANDS))
 
     description = DESCRIPTION_PREFIX + ''.join([
-        "\n  {:<{}}: {}".format(name, space, module.__doc__.strip().lower())
-        for name, module in sorted(samples.items(), key=lambda item: item[0])
+        "\n  {:<{}}: {}".format(name, space, entry['doc'].lower())
+        for name, entry in sorted(samples.items(), key=lambda item: item[0])
+    ])
+    description += "\n\n" + COMMANDS_PREFIX + ''.join([
+        "\n  {:<{}}: {}".format(name, space, command.__doc__.lower())
+        for name, command in sorted(COMMANDS.items())
     ])
+    return description
 
-    parser = argparse.ArgumentParser(
-        prog='pyhow', description=description,
-        formatter_class=argparse.RawDescriptionHelpFormatter)
-    parser.add_argument('sample_name', choices=sorted(samples.keys()))
-    args = parser.parse_args()
 
-    show_sample(samples[args.sample_name])
+class _SampleParser(argparse.ArgumentParser):
+    """Sample command parser, loading the samples manifest for help only."""
+
+    def format_help(self):
+        self.description = _describe_samples(load_manifest())
+        return super().format_help()
+
+
+def main(argv=None):
+    """Parse command line and show the required sample.
+
+    A running pyhow server is asked first and checks the address
+    itself, the samples manifest is only loaded without a server.
+
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = _SampleParser(
+        prog='pyhow', formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        'address', metavar='sample_name[:function]',
+        help="a sample name, optionally followed by a function name or glob")
+    parser.add_argument(
+        '--category', action='append', metavar='NAME', dest='categories',
+        help="only show categories starting with NAME, can be repeated")
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help="ignore and do not update cached sample data and pages")
+    parser.add_argument(
+        '--jobs', type=int, default=1, metavar='N',
+        help="run sample functions in N worker processes")
+    parser.add_argument(
+        '--sandbox', action='store_true',
+        help="run each sample function in a child process with limits")
+    parser.add_argument(
+        '--timeout', type=float, default=10, metavar='SECONDS',
+        help="sandbox wall clock time limit (default: 10)")
+    parser.add_argument(
+        '--max-cpu', type=int, default=None, metavar='SECONDS',
+        help="sandbox CPU time limit, below the timeout (default: none)")
+    parser.add_argument(
+        '--max-memory', type=int, default=1024, metavar='MB',
+        help="sandbox address space limit (default: 1024)")
+    parser.add_argument(
+        '--style', choices=['auto'] + list(STYLES), default='auto',
+        help="text style, auto fits the output (default: auto)")
+    parser.add_argument(
+        '--bench', action='store_true',
+        help="benchmark each sample function")
+    parser.add_argument(
+        '--repeat', type=int, default=5, metavar='N',
+        help="benchmark timing repetitions (default: 5)")
+    parser.add_argument(
+        '--memory', action='store_true',
+        help="trace the memory allocated by each sample function")
+    parser.add_argument(
+        '--memory-top', type=int, default=3, metavar='N',
+        help="allocation sites reported by --memory (default: 3)")
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="profile each sample function, save pstats files")
+    parser.add_argument(
+        '--profile-dir', default='pyhow-profiles', metavar='DIR',
+        help="pstats files directory (default: pyhow-profiles)")
+    parser.add_argument(
+        '--profile-top', type=int, default=5, metavar='N',
+        help="cumulative entries reported by --profile (default: 5)")
+    parser.add_argument(
+        '--output', choices=OUTPUTS, default=TEXT,
+        help="text page or one JSON object per function (default: text)")
+    args = parser.parse_args(argv)
+
+    name, pattern = parse_address(args.address)
+    selection = None if pattern is None else [pattern]
+    probes = {}
+    if args.bench:
+        probes['bench'] = {'repeat': args.repeat}
+    if args.memory:
+        probes['memory'] = {'top': args.memory_top}
+    if args.profile:
+        probes['profile'] = {
+            'directory': os.path.abspath(args.profile_dir),
+            'top': args.profile_top}
+    sandbox = None
+    if args.max_cpu is not None and args.max_cpu >= args.timeout:
+        parser.error("--max-cpu must be below --timeout")
+    if args.sandbox:
+        sandbox = {
+            'timeout': args.timeout, 'max_memory': args.max_memory * 2**20,
+            'max_cpu': args.max_cpu}
+    options = {
+        'use_cache': not args.no_cache, 'jobs': args.jobs,
+        'sandbox': sandbox,
+        'style': None if args.style == 'auto' else args.style,
+        'probes': probes, 'selection': selection,
+        'categories': args.categories, 'profiles': []}
+    connection = connect(default_socket())
+    if connection is None:
+        try:
+            check_address(load_manifest(), name, selection, args.categories)
+        except ValueError as error:
+            parser.error(str(error))
+        show_sample(name, output=args.output, **options)
+    else:
+        try:
+            show_served(connection, name, args.output, **options)
+        except InvalidRequest as error:
+            parser.error(str(error))
+        except ServerError as error:
+            print("pyhow server error: {}".format(error), file=sys.stderr)
+            return 1
+
+    if args.profile:
+        from pyhow.probes import merge_profiles
+        merged = merge_profiles(options['profiles'], os.path.join(
+            probes['profile']['directory'],
+            sample_module_name(name) + '.pstats'))
+        if merged:
+            print("merged profile saved to {}".format(merged), file=sys.stderr)
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
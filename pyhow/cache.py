@@ -0,0 +1,159 @@
+"""pyhow.cache module
+
+Files stored by pyhow in the user cache directory.
+
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from pyhow.extract import extract_sample, extract_source
+
+
+CACHE_VERSION = 10
+
+
+def cache_dir():
+    """Root directory of pyhow cached files."""
+
+    root = os.environ.get('PYHOW_CACHE_DIR')
+    if not root:
+        root = os.path.join(
+            os.environ.get('XDG_CACHE_HOME') or
+            os.path.join(os.path.expanduser('~'), '.cache'), 'pyhow')
+    return root
+
+
+def read_json(filename):
+    """Load a cached JSON file, None when missing or unreadable."""
+
+    try:
+        with open(filename, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(filename, data):
+    """Atomically store a JSON file, silently give up on failure."""
+
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        file_descriptor, temp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(filename), suffix='.tmp')
+        with open(file_descriptor, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle)
+        os.replace(temp_filename, filename)
+    except OSError:
+        pass
+
+
+def clear_cache():
+    """Remove all the cached files, return the number of removed files."""
+
+    removed = 0
+    for root, dirnames, filenames in os.walk(cache_dir(), topdown=False):
+        for filename in filenames:
+            os.remove(os.path.join(root, filename))
+            removed += 1
+        for dirname in dirnames:
+            os.rmdir(os.path.join(root, dirname))
+    return removed
+
+
+def _entry_filename(kind, key, extension='.json'):
+    """Cache file of an entry, stored by cache format version."""
+
+    return os.path.join(
+        cache_dir(), 'v{}'.format(CACHE_VERSION), kind,
+        hashlib.sha1(key.encode('utf-8')).hexdigest() + extension)
+
+
+def cached_extract_sample(filename, use_cache=True):
+    """Extract a sample source file, reuse cached data when unchanged."""
+
+    filename = os.path.abspath(filename)
+    if not use_cache:
+        return extract_sample(filename)
+
+    entry_filename = _entry_filename('metadata', filename)
+    entry = read_json(entry_filename)
+    stat = os.stat(filename)
+    if entry and (entry['size'], entry['mtime']) == (
+            stat.st_size, stat.st_mtime_ns):
+        return entry['sample']
+
+    with open(filename, 'rb') as handle:
+        data = handle.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if not entry or entry['sample']['hash'] != digest:
+        entry = {'sample': extract_source(data, filename)}
+    entry.update(size=stat.st_size, mtime=stat.st_mtime_ns)
+    write_json(entry_filename, entry)
+    return entry['sample']
+
+
+def page_key(sample, options):
+    """Rendered page identifier: sample source, interpreter and options."""
+
+    return json.dumps([sample['hash'], sys.version, options], sort_keys=True)
+
+
+def _run_key(sample, function):
+    """Stored run identifier: function and module trees, interpreter."""
+
+    return json.dumps(
+        [function['code_hash'], sample['context_hash'], sys.version])
+
+
+def load_run(sample, function):
+    """Load the stored run of a sample function, None when missing."""
+
+    return read_json(_entry_filename('runs', _run_key(sample, function)))
+
+
+def store_run(sample, function, run):
+    """Store the run of a deterministic sample function."""
+
+    write_json(_entry_filename('runs', _run_key(sample, function)), run)
+
+
+def load_page(key):
+    """Load the parts of a cached rendered page, None when missing."""
+
+    try:
+        with open(_entry_filename('pages', key, '.jsonl'),
+                  encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle]
+    except (OSError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def page_writer(key):
+    """Give a function storing page parts one at a time.
+
+    The page is only kept when the with block completes.
+
+    """
+
+    filename = _entry_filename('pages', key, '.jsonl')
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        file_descriptor, temp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(filename), suffix='.tmp')
+    except OSError:
+        yield lambda part: None
+        return
+
+    try:
+        with open(file_descriptor, 'w', encoding='utf-8') as handle:
+            yield lambda part: handle.write(json.dumps(part) + '\n')
+        os.replace(temp_filename, filename)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
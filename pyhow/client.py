@@ -0,0 +1,125 @@
+"""pyhow.client module
+
+Command line side of the pyhow server: find it, send it a request, print
+the rendered chunks. Only light modules are imported, so that asking a
+running server stays faster than rendering in the command line process.
+
+"""
+
+import getpass
+import json
+import os
+import socket
+import stat
+import tempfile
+
+from pyhow import NDJSON
+from pyhow.manifest import installed_samples_key
+from pyhow.pager import default_style, open_pager, open_stdout
+
+
+class ServerError(Exception):
+    """The pyhow server failed to render a sample."""
+
+
+class InvalidRequest(ServerError):
+    """The pyhow server does not know the requested sample functions."""
+
+
+def default_socket():
+    """Location of the pyhow server socket of the installed samples.
+
+    Sockets live in the user runtime directory, never in the cache
+    directory, so that clearing the cache keeps servers reachable.
+
+    """
+
+    if os.environ.get('PYHOW_SOCKET'):
+        return os.environ['PYHOW_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(
+        tempfile.gettempdir(), 'pyhow-{}'.format(getpass.getuser()))
+    return os.path.join(runtime_dir, 'pyhow-{}.sock'.format(
+        installed_samples_key()))
+
+
+def private_directory(socket_path):
+    """Tell whether a socket directory is only accessible to this user.
+
+    Anyone can create a predictable directory in the temporary directory
+    first: servers neither trust nor listen in directories of other
+    users, or opened to them.
+
+    """
+
+    try:
+        status = os.lstat(os.path.dirname(os.path.abspath(socket_path)))
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(status.st_mode) and status.st_uid == os.getuid() and
+        stat.S_IMODE(status.st_mode) == 0o700)
+
+
+def connect(socket_path):
+    """Connect to a running pyhow server, None when there is none.
+
+    Sockets out of a private_directory() are ignored.
+
+    """
+
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    if not private_directory(socket_path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def request_chunks(connection, request, profiles=None):
+    """Send a request to a pyhow server, yield the rendered chunks.
+
+    The pstats files saved by the server are appended to the profiles
+    list, when given.
+
+    """
+
+    with connection, connection.makefile('rwb') as stream:
+        stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        stream.flush()
+        for line in stream:
+            message = json.loads(line.decode('utf-8'))
+            if 'invalid' in message:
+                raise InvalidRequest(message['invalid'])
+            if 'error' in message:
+                raise ServerError(message['error'])
+            if message.get('done'):
+                if profiles is not None:
+                    profiles.extend(message['profiles'])
+                return
+            yield message['chunk']
+    raise ServerError("connection closed by the server")
+
+
+def show_served(
+        connection, name, output, style=None, profiles=None, **options):
+    """Print a sample rendered by a pyhow server, like show_sample()."""
+
+    open_output = open_stdout
+    if output != NDJSON:
+        options['style'] = style or default_style()
+        open_output = open_pager
+    request = {'name': name, 'output': output, 'options': options}
+    chunks = request_chunks(connection, request, profiles)
+    # invalid requests are answered before the pager is opened
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return
+    with open_output() as write:
+        write(first_chunk)
+        for chunk in chunks:
+            write(chunk)
@@ -0,0 +1,191 @@
+"""pyhow.export module
+
+Export all the samples to a documentation tree: one file per sample
+module and an index, as plain text, Markdown or HTML.
+
+"""
+
+import concurrent.futures
+import html
+import os
+
+from pyhow import render_page
+from pyhow.cache import cached_extract_sample
+from pyhow.extract import group_by_category
+from pyhow.registry import make_samples
+from pyhow.runner import format_result, run_functions
+from pyhow.style import PLAIN
+
+
+_MARKDOWN_PAGE = """# {name}
+
+{doc}
+"""
+
+_MARKDOWN_CATEGORY = """
+## {category}
+"""
+
+_MARKDOWN_FUNCTION = """
+### {name}
+
+{doc}
+
+```python
+{code}
+
+>>> {name}()
+{result}
+```
+"""
+
+_MARKDOWN_INDEX = """# pyhow samples
+
+{items}
+"""
+
+_MARKDOWN_INDEX_ITEM = "- [{name}]({filename}): {doc}\n"
+
+_HTML_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{body}</body>
+</html>
+"""
+
+_HTML_TITLE = "<h1>{name}</h1>\n<p>{doc}</p>\n"
+
+_HTML_CATEGORY = "<h2>{category}</h2>\n"
+
+_HTML_FUNCTION = """<h3 id="{name}">{name}</h3>
+<p>{doc}</p>
+<pre><code>{code}
+
+&gt;&gt;&gt; {name}()
+{result}</code></pre>
+"""
+
+_HTML_INDEX_ITEM = '<li><a href="{filename}">{name}</a>: {doc}</li>\n'
+
+_TEXT_INDEX_ITEM = "  {name}: {doc}\n"
+
+
+def _function_fields(function, runs, escape):
+    """Template fields of a sample function."""
+
+    return {
+        'name': escape(function['name']),
+        'doc': escape(function['doc']),
+        'code': escape(''.join(function['codelines']).rstrip()),
+        'result': escape(format_result(runs[function['name']])),
+    }
+
+
+def _text_page(name, sample, runs):
+    """Plain text page of a sample module, as shown by pyhow."""
+
+    return ''.join(render_page(sample, runs, PLAIN))
+
+
+def _markdown_page(name, sample, runs):
+    """Markdown page of a sample module."""
+
+    text = _MARKDOWN_PAGE.format(name=name, doc=sample['doc'])
+    for category, functions in group_by_category(sample['functions']):
+        text += _MARKDOWN_CATEGORY.format(category=category)
+        for function in functions:
+            text += _MARKDOWN_FUNCTION.format(
+                **_function_fields(function, runs, str))
+    return text
+
+
+def _html_page(name, sample, runs):
+    """HTML page of a sample module."""
+
+    body = _HTML_TITLE.format(
+        name=html.escape(name), doc=html.escape(sample['doc']))
+    for category, functions in group_by_category(sample['functions']):
+        body += _HTML_CATEGORY.format(category=html.escape(category))
+        for function in functions:
+            body += _HTML_FUNCTION.format(
+                **_function_fields(function, runs, html.escape))
+    return _HTML_PAGE.format(title=html.escape(name), body=body)
+
+
+def _text_index(items):
+    """Plain text index of the exported samples."""
+
+    return "pyhow samples\n\n" + ''.join(
+        _TEXT_INDEX_ITEM.format(**item) for item in items)
+
+
+def _markdown_index(items):
+    """Markdown index of the exported samples."""
+
+    return _MARKDOWN_INDEX.format(items=''.join(
+        _MARKDOWN_INDEX_ITEM.format(**item) for item in items))
+
+
+def _html_index(items):
+    """HTML index of the exported samples."""
+
+    return _HTML_PAGE.format(
+        title="pyhow samples", body="<h1>pyhow samples</h1>\n<ul>\n{}</ul>\n"
+        .format(''.join(
+            _HTML_INDEX_ITEM.format(**{
+                key: html.escape(value) for key, value in item.items()})
+            for item in items)))
+
+
+EXPORT_FORMATS = {
+    'txt': ('.txt', _text_page, _text_index),
+    'md': ('.md', _markdown_page, _markdown_index),
+    'html': ('.html', _html_page, _html_index),
+}
+
+
+def run_module(name, sample):
+    """Run all the functions of a sample module, in a worker process."""
+
+    function_names = [function['name'] for function in sample['functions']]
+    return dict(zip(
+        function_names, run_functions(name, sample, function_names)))
+
+
+def export_samples(directory, export_format='md', jobs=None):
+    """Export all the samples to a directory, return the written files.
+
+    Samples are located and extracted once, then each module is run in
+    one of the jobs worker processes. Pages are written as soon as their
+    module is run.
+
+    """
+
+    extension, render_module, render_index = EXPORT_FORMATS[export_format]
+    samples = {
+        name: cached_extract_sample(filename)
+        for name, filename in make_samples().items()}
+    os.makedirs(directory, exist_ok=True)
+
+    written = []
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        futures = {
+            executor.submit(run_module, name, sample): name
+            for name, sample in samples.items()}
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            filename = os.path.join(directory, name + extension)
+            text = render_module(name, samples[name], future.result())
+            with open(filename, 'w', encoding='utf-8') as handle:
+                handle.write(text)
+            written.append(filename)
+
+    filename = os.path.join(directory, 'index' + extension)
+    with open(filename, 'w', encoding='utf-8') as handle:
+        handle.write(render_index([
+            {'name': name, 'filename': name + extension,
+             'doc': samples[name]['doc']}
+            for name in sorted(samples)]))
+    written.append(filename)
+    return written
@@ -0,0 +1,261 @@
+"""pyhow.extract module
+
+Read sample modules in a single pass, without importing them.
+
+Sample functions declared with @pyhow.sample, under any name it is
+imported as, get their metadata from the decorator arguments. In
+modules without any declaration, all the functions but run() are
+samples, categorized by comment tags.
+
+"""
+
+import ast
+import bisect
+import collections
+import fnmatch
+import hashlib
+import importlib.util
+import itertools
+
+from pyhow.registry import sample_metadata
+
+
+CATEGORY_TAG = "# category: "
+
+NONDETERMINISTIC_TAG = "# nondeterministic"
+
+UNCATEGORIZED = 'uncategorized'
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# modules the sample decorator is imported from
+_DECORATOR_MODULES = ('pyhow', 'pyhow.registry')
+
+
+def _read_categories(lines):
+    """Find category tags, return their names and line numbers."""
+
+    names, line_numbers = [UNCATEGORIZED], [0]
+    for line_number, line in enumerate(lines, 1):
+        if line.strip().startswith(CATEGORY_TAG):
+            names.append(line.strip().replace(CATEGORY_TAG, ''))
+            line_numbers.append(line_number)
+    return names, line_numbers
+
+
+def _dotted_name(node):
+    """Dotted name of a name or attribute node, e.g. 'pyhow.sample'."""
+
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return value and value + '.' + node.attr
+    return None
+
+
+def _decorator_names(tree):
+    """Dotted names the sample decorator is imported as in a module."""
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and not node.level and (
+                node.module in _DECORATOR_MODULES):
+            names.update(
+                alias.asname or alias.name for alias in node.names
+                if alias.name == 'sample')
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name not in _DECORATOR_MODULES:
+                    continue
+                if alias.asname:
+                    names.add(alias.asname + '.sample')
+                else:
+                    # import pyhow.registry also binds pyhow
+                    names.update([alias.name + '.sample', 'pyhow.sample'])
+    return names
+
+
+def _sample_decorator(node, names):
+    """The @sample decorator of a function node, None when undeclared."""
+
+    for decorator in node.decorator_list:
+        target = decorator
+        if isinstance(decorator, ast.Call):
+            target = decorator.func
+        if _dotted_name(target) in names:
+            return decorator
+    return None
+
+
+def _check_decorator_uses(tree, names, decorators, filename):
+    """Raise ValueError on sample decorator uses unreadable from source.
+
+    The decorator must be applied directly to module level functions,
+    e.g. neither to methods nor through another name.
+
+    """
+
+    readable = set()
+    for decorator in decorators:
+        readable.add(decorator)
+        if isinstance(decorator, ast.Call):
+            readable.add(decorator.func)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Name, ast.Attribute)) and (
+                node not in readable and _dotted_name(node) in names):
+            raise ValueError(
+                "{}:{}: @sample must directly decorate module functions"
+                .format(filename, node.lineno))
+
+
+def _read_metadata(decorator, filename):
+    """Metadata of a @sample decorator, from its literal arguments."""
+
+    if isinstance(decorator, ast.Call) and (decorator.args or any(
+            keyword.arg is None for keyword in decorator.keywords)):
+        raise ValueError("{}:{}: @sample only takes keyword arguments"
+                         .format(filename, decorator.lineno))
+    metadata = {}
+    for keyword in getattr(decorator, 'keywords', []):
+        try:
+            metadata[keyword.arg] = ast.literal_eval(keyword.value)
+        except ValueError:
+            raise ValueError("{}:{}: @sample arguments must be literals"
+                             .format(filename, decorator.lineno)) from None
+    try:
+        return sample_metadata(metadata)
+    except ValueError as error:
+        raise ValueError("{}:{}: {}".format(
+            filename, decorator.lineno, error)) from None
+
+
+def _hash_nodes(nodes):
+    """Hash of syntax trees, ignoring comments, formatting and positions."""
+
+    return hashlib.sha256('\n'.join(
+        ast.dump(node) for node in nodes).encode('utf-8')).hexdigest()
+
+
+def extract_sample(filename):
+    """Extract module and functions data from a sample source file."""
+
+    with open(filename, 'rb') as handle:
+        return extract_source(handle.read(), filename)
+
+
+def extract_source(data, filename='<sample>'):
+    """Extract module and functions data from sample source bytes.
+
+    Functions get the code_hash of their syntax tree, the sample gets
+    the context_hash of the rest of the module, e.g. imports and helpers.
+
+    """
+
+    source = importlib.util.decode_source(data)
+    lines = source.splitlines(True)
+    tree = ast.parse(source, filename)
+
+    nodes = [
+        node for node in tree.body
+        if isinstance(node, _FUNCTION_NODES) and node.name != 'run']
+    names = _decorator_names(tree)
+    decorators = {
+        node.name: _sample_decorator(node, names) for node in nodes}
+    _check_decorator_uses(
+        tree, names, [decorator for decorator in decorators.values()
+                      if decorator], filename)
+    if any(decorators.values()):
+        nodes = [node for node in nodes if decorators[node.name]]
+    metadata = {
+        node.name: _read_metadata(decorators[node.name], filename)
+        if decorators[node.name] else sample_metadata({})
+        for node in nodes}
+
+    # comment tags are only read for functions without declared category
+    category_names, category_line_numbers = [UNCATEGORIZED], [0]
+    if not all(metadata[node.name]['category'] for node in nodes):
+        category_names, category_line_numbers = _read_categories(lines)
+    categories = list(zip(category_line_numbers[1:], category_names[1:]))
+
+    functions = []
+    context = [node for node in tree.body if node not in nodes]
+    for node in nodes:
+        decorator = decorators[node.name]
+        first_line = min(
+            [node.lineno] + [item.lineno for item in node.decorator_list])
+        category = metadata[node.name]['category']
+        if category:
+            categories.append((first_line, category))
+        else:
+            category = category_names[bisect.bisect_left(
+                category_line_numbers, first_line) - 1]
+        hidden_lines = range(0)
+        if decorator:
+            hidden_lines = range(decorator.lineno, decorator.end_lineno + 1)
+        doc = ast.get_docstring(node, clean=False)
+        previous_line = lines[first_line - 2] if first_line > 1 else ''
+        functions.append({
+            'name': node.name,
+            'doc': doc.strip() if doc else '',
+            'codelines': [
+                line for line_number, line in enumerate(
+                    lines[first_line - 1:node.end_lineno], first_line)
+                if line.strip() and '"""' not in line and
+                line_number not in hidden_lines],
+            'category': category,
+            'lines': [first_line, node.end_lineno],
+            'code_hash': _hash_nodes([node]),
+            'deterministic': metadata[node.name]['deterministic'] and not (
+                previous_line.strip().startswith(NONDETERMINISTIC_TAG)),
+            'cost': metadata[node.name]['cost'],
+            'tags': metadata[node.name]['tags'],
+        })
+    functions.sort(key=lambda function: function['name'])
+
+    return {
+        'hash': hashlib.sha256(data).hexdigest(),
+        'context_hash': _hash_nodes(context),
+        'doc': (ast.get_docstring(tree) or '').strip(),
+        'categories': list(collections.OrderedDict.fromkeys(
+            name for _, name in sorted(categories))),
+        'functions': functions,
+    }
+
+
+def group_by_category(functions):
+    """Sort functions by category then name, list (category, functions)."""
+
+    functions = sorted(functions, key=lambda x: x['name'])
+    functions = sorted(functions, key=lambda x: x['category'])
+    return [
+        (category, list(category_functions))
+        for category, category_functions in itertools.groupby(
+            functions, key=lambda x: x['category'])]
+
+
+def match_name(name, patterns):
+    """Tell whether a function name matches one of the glob patterns."""
+
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def match_category(category, prefixes):
+    """Tell whether a category starts with one of the prefixes."""
+
+    return any(
+        category.lower().startswith(prefix.lower()) for prefix in prefixes)
+
+
+def select_functions(functions, patterns=None, categories=None):
+    """Keep the functions matching name glob patterns and category prefixes.
+
+    None patterns or categories select every function.
+
+    """
+
+    return [
+        function for function in functions
+        if (patterns is None or match_name(function['name'], patterns)) and (
+            categories is None or match_category(
+                function['category'], categories))]
@@ -0,0 +1,115 @@
+"""pyhow.manifest module
+
+Names, docstrings, categories and functions of the samples, stored in
+the cache so that the command line never imports sample code.
+
+"""
+
+import hashlib
+import os
+
+import pyhow.samples
+from pyhow import make_samples
+from pyhow.cache import (
+    CACHE_VERSION, cache_dir, cached_extract_sample, read_json, write_json)
+from pyhow.extract import (
+    UNCATEGORIZED, match_category, match_name, select_functions)
+
+
+MANIFEST_VERSION = 2
+
+# entries come from extracted data: rebuilt with each cache version
+_STORED_VERSION = [CACHE_VERSION, MANIFEST_VERSION]
+
+
+def installed_samples_key():
+    """Short key of the installed samples, from their directory."""
+
+    samples_root = os.path.abspath(pyhow.samples.__path__[0])
+    return hashlib.sha1(samples_root.encode('utf-8')).hexdigest()[:12]
+
+
+def installed_samples_filename(prefix):
+    """Location of a cache file describing the installed samples."""
+
+    return os.path.join(cache_dir(), '{}-{}.json'.format(
+        prefix, installed_samples_key()))
+
+
+def manifest_filename():
+    """Location of the manifest of the installed samples."""
+
+    return installed_samples_filename('manifest')
+
+
+def _describe_sample(filename):
+    """Read the manifest entry of a sample module from its source."""
+
+    sample = cached_extract_sample(filename)
+    return {
+        'filename': filename,
+        'mtime': os.stat(filename).st_mtime_ns,
+        'doc': sample['doc'],
+        'categories': sample['categories'],
+        'functions': [
+            {'name': function['name'], 'category': function['category']}
+            for function in sample['functions']],
+    }
+
+
+def build_manifest(previous=None):
+    """Describe all samples, reuse the unchanged entries of a manifest."""
+
+    previous = previous or {}
+    samples = {}
+    for name, filename in make_samples().items():
+        entry = previous.get(name)
+        if not entry or entry['filename'] != filename or (
+                entry['mtime'] != os.stat(filename).st_mtime_ns):
+            entry = _describe_sample(filename)
+        samples[name] = entry
+    return samples
+
+
+def load_manifest():
+    """Load the samples manifest, refresh it when sample files changed."""
+
+    filename = manifest_filename()
+    manifest = read_json(filename)
+    previous = None
+    if manifest and manifest.get('version') == _STORED_VERSION:
+        previous = manifest['samples']
+
+    samples = build_manifest(previous)
+    if samples != previous:
+        write_json(filename, {'version': _STORED_VERSION, 'samples': samples})
+    return samples
+
+
+def check_address(samples, name, selection=None, categories=None):
+    """Raise ValueError unless the manifest knows the selected functions.
+
+    selection and categories are lists of function name glob patterns
+    and category prefixes, as given to render_sample(). Together, they
+    must select at least one function.
+
+    """
+
+    if name not in samples:
+        raise ValueError("unknown sample {!r}, choose from {}".format(
+            name, ', '.join(sorted(samples))))
+    functions = samples[name]['functions']
+    for pattern in selection or []:
+        if not any(match_name(function['name'], [pattern])
+                   for function in functions):
+            raise ValueError("no function of {} matches {!r}".format(
+                name, pattern))
+    for category in categories or []:
+        if not any(match_category(known, [category]) for known in (
+                [UNCATEGORIZED] + samples[name]['categories'])):
+            raise ValueError("no category of {} starts with {!r}".format(
+                name, category))
+    if not select_functions(functions, selection, categories):
+        raise ValueError("no function of {} matches {} in {}".format(
+            name, ', '.join(map(repr, selection or ['*'])),
+            ', '.join(map(repr, categories or ['*']))))
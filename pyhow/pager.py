@@ -0,0 +1,96 @@
+"""pyhow.pager module
+
+Send text to the pager, or to the standard output, as it is rendered.
+
+"""
+
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+
+from pyhow.style import ANSI, OVERSTRIKE, PLAIN
+
+
+def _pager_command():
+    """Command of the pager to pipe text into, None for standard output."""
+
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        return None
+    command = os.environ.get('MANPAGER') or os.environ.get('PAGER')
+    if command:
+        return command
+    if os.environ.get('TERM') in ('dumb', 'emacs'):
+        return None
+    return shutil.which('less') and 'less' or shutil.which('more') and 'more'
+
+
+def default_style():
+    """Text style fitting the output: pager, terminal or plain stream."""
+
+    if os.environ.get('TERM') in ('dumb', 'emacs'):
+        return PLAIN
+    if _pager_command() is not None:
+        return OVERSTRIKE
+    return ANSI if sys.stdout.isatty() else PLAIN
+
+
+@contextlib.contextmanager
+def open_stdout():
+    """Give a function writing text chunks to the standard output.
+
+    A closed output, e.g. piped into head, silently ends the with block.
+
+    """
+
+    def write(text):
+        """Write text to the standard output."""
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    try:
+        yield write
+    except BrokenPipeError:
+        # no more flushing at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+@contextlib.contextmanager
+def open_pager():
+    """Give a function writing text chunks to the pager, as they come.
+
+    Quitting the pager silently ends the with block.
+
+    """
+
+    command = _pager_command()
+    if command is None:
+        with open_stdout() as write:
+            yield write
+        return
+
+    # let less display ANSI escape sequences
+    env = dict(os.environ, LESS=os.environ.get('LESS', '') + 'R')
+    process = subprocess.Popen(
+        command, shell=True, stdin=subprocess.PIPE, env=env,
+        errors='backslashreplace')
+
+    def write_pager(text):
+        """Write text to the pager."""
+        process.stdin.write(text)
+        process.stdin.flush()
+
+    try:
+        with process.stdin:
+            yield write_pager
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        # never leave the pager running, even on rendering errors
+        while True:
+            try:
+                process.wait()
+                break
+            except KeyboardInterrupt:
+                pass
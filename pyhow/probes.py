@@ -0,0 +1,260 @@
+"""pyhow.probes module
+
+Measure sample functions, on top of running them.
+
+Each probe calls a sample function and describes it with a dict of
+measures, formatted as report lines under the function result. Probes
+measuring a single call run first, the first of them measures the first
+call of the function, e.g. with its pattern compilations.
+
+"""
+
+import cProfile
+import fnmatch
+import functools
+import os
+import pstats
+import re
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+
+
+BENCH_MIN_TIME = 0.02
+
+
+def _calibrate(timer, min_time):
+    """Find a number of loops lasting at least min_time, like autorange."""
+
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            loops = number * multiplier
+            if timer.timeit(loops) >= min_time:
+                return loops
+        number *= 10
+
+
+def benchmark(method, repeat=5, warmup=1):
+    """Time a sample function, in nanoseconds per call."""
+
+    timer = timeit.Timer(method)
+    for _ in range(warmup):
+        timer.timeit(1)
+    number = _calibrate(timer, BENCH_MIN_TIME)
+    timings = [
+        elapsed * 1e9 / number for elapsed in timer.repeat(repeat, number)]
+    median = statistics.median(timings)
+    return {
+        'loops': number,
+        'repeat': repeat,
+        'min': min(timings),
+        'median': median,
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'ops': 1e9 / median if median else float('inf'),
+    }
+
+
+def format_benchmark(measures):
+    """Report lines of a benchmark."""
+
+    return [
+        "{median:,.0f} ns/op, {ops:,.0f} ops/sec".format(**measures),
+        "min {min:,.0f} ns, median {median:,.0f} ns, stddev {stddev:,.0f} ns"
+        " ({repeat} x {loops:,} loops)".format(**measures),
+    ]
+
+
+def _module_pattern(module):
+    """tracemalloc filename pattern of a module, or of a whole package."""
+
+    if os.path.basename(module.__file__) == '__init__.py':
+        return os.path.join(os.path.dirname(module.__file__), '*')
+    return module.__file__
+
+
+def memory(method, top=3):
+    """Trace the memory allocated by a sample function call, in bytes.
+
+    Python 3.8 cannot reset the peak of an already running trace: the
+    peak is then unknown, None.
+
+    """
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        peak_known = started
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            peak_known = True
+        initial_size, _ = tracemalloc.get_traced_memory()
+
+        result = method()
+        size, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del result
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    # filtering compiles fnmatch patterns: only filter both snapshots
+    # once taken, and leave out the frames of the filtering itself
+    ignored = [
+        tracemalloc.Filter(False, _module_pattern(module))
+        for module in (tracemalloc, sys.modules[__name__], fnmatch, re)]
+    before = before.filter_traces(ignored)
+    after = after.filter_traces(ignored)
+    sites = [
+        statistic for statistic in after.compare_to(before, 'lineno')
+        if statistic.size_diff > 0][:top]
+    return {
+        'peak': peak - initial_size if peak_known else None,
+        'net': size - initial_size,
+        'sites': [{
+            'filename': statistic.traceback[0].filename,
+            'lineno': statistic.traceback[0].lineno,
+            'size': statistic.size_diff,
+            'count': statistic.count_diff,
+        } for statistic in sites],
+    }
+
+
+def format_memory(measures):
+    """Report lines of a memory trace."""
+
+    lines = ["net {net:,} B allocated".format(**measures)]
+    if measures['peak'] is not None:
+        lines = ["peak {peak:,} B, net {net:,} B allocated".format(
+            **measures)]
+    lines.extend(
+        "  {size:,} B in {count:,} blocks at {short_filename}:{lineno}".format(
+            short_filename=os.path.join(*site['filename'].split(os.sep)[-2:]),
+            **site)
+        for site in measures['sites'])
+    return lines
+
+
+def profile(method, directory, top=5):
+    """Profile a sample function call, save the pstats file."""
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(method)
+    del result
+
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, '{}.{}.pstats'.format(
+        method.__module__, method.__name__))
+    profiler.dump_stats(filename)
+
+    stats = pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+    entries = []
+    for function in [
+            function for function in stats.fcn_list
+            if function[0] != __file__][:top]:
+        _, ncalls, tottime, cumtime, _ = stats.stats[function]
+        entries.append({
+            'function': pstats.func_std_string(function),
+            'ncalls': ncalls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    return {'filename': filename, 'entries': entries}
+
+
+def format_profile(measures):
+    """Report lines of a profile."""
+
+    lines = ["profile saved to {filename}".format(**measures)]
+    lines.extend(
+        "  {cumtime:8.6f}s cumulative {tottime:8.6f}s own {ncalls:>5} calls"
+        " {function}".format(**entry)
+        for entry in measures['entries'])
+    return lines
+
+
+def merge_profiles(filenames, filename):
+    """Merge function pstats files in a single one, None without files."""
+
+    if not filenames:
+        return None
+    pstats.Stats(*filenames).dump_stats(filename)
+    return filename
+
+
+PROBES = {
+    'bench': (benchmark, format_benchmark),
+    'memory': (memory, format_memory),
+    'profile': (profile, format_profile),
+}
+
+
+# probes measuring one call, run before the probes repeating calls
+_SINGLE_CALL_PROBES = ('memory', 'profile')
+
+
+def record_first_call(method):
+    """Wrap a sample function to keep the outcome of its first call.
+
+    Return the wrapper and a dict filled by the first call with its
+    'result' or its 'error' exception, and its 'duration'.
+
+    """
+
+    first_call = {}
+
+    @functools.wraps(method)
+    def recorded():
+        """Call the sample function, record its first call."""
+        if first_call:
+            return method()
+        started = time.perf_counter()
+        try:
+            first_call['result'] = method()
+        except Exception as error:
+            first_call['error'] = error
+            raise
+        finally:
+            first_call['duration'] = time.perf_counter() - started
+        return first_call['result']
+
+    return recorded, first_call
+
+
+def run_probes(method, probes):
+    """Measure a sample function with each probe and its options.
+
+    Probes measuring a single call run first, each without compiled
+    patterns in the re cache. Measures keep the order of the probes.
+
+    """
+
+    measures = {}
+    for name in sorted(
+            probes, key=lambda name: name not in _SINGLE_CALL_PROBES):
+        probe, options = PROBES[name][0], probes[name]
+        if name in _SINGLE_CALL_PROBES:
+            # measure pattern compilations, not hits of the re cache
+            re.purge()
+        try:
+            measures[name] = probe(method, **options)
+        except Exception as error:
+            measures[name] = {'error': '{}: {}'.format(
+                type(error).__name__, error)}
+    return {name: measures[name] for name in probes}
+
+
+def format_measures(measures):
+    """Report lines of all the probe measures of a sample function."""
+
+    lines = []
+    for name, measure in measures.items():
+        if 'error' in measure:
+            lines.append("{} failed: {}".format(name, measure['error']))
+        else:
+            lines.extend(PROBES[name][1](measure))
+    return lines
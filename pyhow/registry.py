@@ -0,0 +1,107 @@
+"""pyhow.registry module
+
+Find and load sample modules by name, declare sample functions.
+
+"""
+
+import importlib
+import importlib.util
+import os
+import pkgutil
+
+import pyhow.samples
+
+
+_SAMPLES_ROOT = 'pyhow.samples.'
+
+CHEAP = 'cheap'
+SLOW = 'slow'
+COSTS = (CHEAP, SLOW)
+
+SAMPLE_DEFAULTS = {
+    'category': None, 'deterministic': True, 'cost': CHEAP, 'tags': ()}
+
+
+def make_samples():
+    """Locate sample modules by name, without importing them."""
+
+    samples = {}
+    for module_info in pkgutil.walk_packages(
+            pyhow.samples.__path__, _SAMPLES_ROOT):
+        if module_info.ispkg:
+            continue
+        basename = module_info.name.rpartition('.')[2]
+        if basename.startswith('_'):
+            continue
+        samples[module_info.name[len(_SAMPLES_ROOT):]] = os.path.join(
+            module_info.module_finder.path, basename + '.py')
+    return samples
+
+
+def parse_address(address):
+    """Split a 'module:function' sample address.
+
+    Return the sample name and the function glob pattern, None when the
+    address is only a sample name.
+
+    """
+
+    name, _, pattern = address.partition(':')
+    return name, pattern or None
+
+
+def sample_module_name(name):
+    """Full Python module name of a sample."""
+
+    return _SAMPLES_ROOT + name
+
+
+def load_sample(name):
+    """Import a sample module from its name."""
+
+    return importlib.import_module(sample_module_name(name))
+
+
+def sample_filename(name):
+    """Source file of a sample module, without importing it."""
+
+    return importlib.util.find_spec(sample_module_name(name)).origin
+
+
+def sample_metadata(metadata):
+    """Complete the metadata of a sample function with the defaults.
+
+    Raise ValueError on unknown keys, on a cost other than CHEAP or
+    SLOW, or on tags other than a list of strings.
+
+    """
+
+    unknown = set(metadata) - set(SAMPLE_DEFAULTS)
+    if unknown:
+        raise ValueError("unknown sample metadata: {}".format(
+            ', '.join(sorted(str(key) for key in unknown))))
+    metadata = dict(SAMPLE_DEFAULTS, **metadata)
+    if metadata['cost'] not in COSTS:
+        raise ValueError("sample cost must be one of {}".format(
+            ', '.join(COSTS)))
+    if not isinstance(metadata['tags'], (list, tuple)) or not all(
+            isinstance(tag, str) for tag in metadata['tags']):
+        raise ValueError("sample tags must be a list of strings")
+    metadata['tags'] = list(metadata['tags'])
+    return metadata
+
+
+def sample(function=None, **metadata):
+    """Declare a sample function: @sample or @sample(category=...).
+
+    Metadata keys are category, deterministic, cost (CHEAP or SLOW) and
+    tags. pyhow.extract reads them from the source without importing
+    the module: values must be literals. Both check them with
+    sample_metadata().
+
+    """
+
+    sample_metadata(metadata)
+    if function is None:
+        return lambda function: function
+    return function
@@ -0,0 +1,29 @@
+"""pyhow.resources module
+
+Resources private to each sample function run, so that concurrent runs,
+in one pyhow process or in several ones, never collide.
+
+"""
+
+import contextlib
+import shutil
+import tempfile
+
+
+@contextlib.contextmanager
+def private_tempdir():
+    """Make tempfile use a new private directory, removed at exit.
+
+    Sample functions creating temporary files or paths with tempfile
+    functions get them in this directory, with nothing left behind.
+
+    """
+
+    directory = tempfile.mkdtemp(prefix='pyhow-')
+    previous_tempdir = tempfile.tempdir
+    tempfile.tempdir = directory
+    try:
+        yield directory
+    finally:
+        tempfile.tempdir = previous_tempdir
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,386 @@
+"""pyhow.runner module
+
+Run sample functions, in the current process, in worker processes or
+in sandboxed child processes.
+
+Each run is described by a dict: {'status': 'ok', 'result': repr} when
+the function returned, {'status': status, 'error': message} otherwise.
+Runs also hold their 'duration' in seconds, the 'exception' raised by
+the function if any, when successful the 'measures' of the requested
+probes, and for coroutine functions awaited together, the 'gather'
+wall time and size of the group. Runs reused from the cache are marked
+'cached', their duration is None.
+
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import itertools
+import multiprocessing
+import signal
+import threading
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from pyhow.cache import load_run, store_run
+from pyhow.probes import record_first_call, run_probes
+from pyhow.registry import load_sample
+from pyhow.resources import private_tempdir
+
+
+OK = 'ok'
+ERROR = 'error'
+TIMEOUT = 'timeout'
+MEMORY_LIMIT = 'memory limit'
+CPU_LIMIT = 'cpu limit'
+CRASHED = 'crashed'
+
+
+def _failed_run(error):
+    """Describe a sample function run stopped by an exception."""
+
+    if isinstance(error, MemoryError):
+        return {'status': MEMORY_LIMIT, 'error': "out of memory"}
+    return {
+        'status': ERROR,
+        'error': '{}: {}'.format(type(error).__name__, error),
+        'exception': {
+            'type': type(error).__name__,
+            'message': str(error),
+            'traceback': ''.join(traceback.format_exception(
+                type(error), error, error.__traceback__)),
+        },
+    }
+
+
+async def _await_sample(method):
+    """Await a sample coroutine function, describe its result."""
+
+    started = time.perf_counter()
+    try:
+        run = {'status': OK, 'result': repr(await method())}
+    except Exception as error:
+        run = _failed_run(error)
+    run['duration'] = time.perf_counter() - started
+    return run
+
+
+def _synchronous(method):
+    """Call a coroutine function in its own event loop, e.g. for probes."""
+
+    @functools.wraps(method)
+    def run_coroutine():
+        """Run the coroutine function until complete."""
+        return asyncio.run(method())
+
+    return run_coroutine
+
+
+def _call_measured(method, probes=None):
+    """Call a sample function, under its probes, describe its first call.
+
+    Probes make the calls: the first call of the function, cold, is the
+    one measured by the first probe, see pyhow.probes.run_probes().
+
+    """
+
+    recorded, first_call = record_first_call(method)
+    measures = run_probes(recorded, probes or {})
+    if not first_call:
+        # no probe requested or called the function
+        try:
+            recorded()
+        except Exception:
+            pass
+
+    if 'error' in first_call:
+        run = _failed_run(first_call['error'])
+    else:
+        run = {'status': OK, 'result': repr(first_call['result'])}
+        if probes:
+            run['measures'] = measures
+    run['duration'] = first_call['duration']
+    return run
+
+
+def call_sample(name, function_name, probes=None):
+    """Run a sample function, describe its result.
+
+    Coroutine functions are awaited in their own event loop. Temporary
+    files go to a private directory, see pyhow.resources.
+
+    """
+
+    method = getattr(load_sample(name), function_name)
+    with private_tempdir():
+        if inspect.iscoroutinefunction(method):
+            if not probes:
+                return asyncio.run(_await_sample(method))
+            method = _synchronous(method)
+        return _call_measured(method, probes)
+
+
+async def _gather_samples(methods):
+    """Await sample coroutine functions concurrently."""
+
+    return await asyncio.gather(*[_await_sample(method) for method in methods])
+
+
+def call_coroutines(name, function_names):
+    """Await sample coroutine functions together on one event loop.
+
+    Each run also gets the 'gather' wall time of all the coroutines and
+    their number, to compare with the sum of their durations.
+
+    """
+
+    module = load_sample(name)
+    methods = [
+        getattr(module, function_name) for function_name in function_names]
+    with private_tempdir():
+        started = time.perf_counter()
+        runs = asyncio.run(_gather_samples(methods))
+        gather = {'size': len(runs), 'wall': time.perf_counter() - started}
+
+        for run in runs:
+            run['gather'] = gather
+    return runs
+
+
+def format_result(run):
+    """Format the result of a sample function run."""
+
+    if run['status'] == OK:
+        return run['result']
+    return '<{}: {}>'.format(run['status'], run['error'])
+
+
+def _set_limits(max_memory, max_cpu):
+    """Limit the address space and the CPU time of the current process."""
+
+    if resource is None:
+        return
+    if max_memory:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+    if max_cpu:
+        resource.setrlimit(resource.RLIMIT_CPU, (max_cpu, max_cpu + 1))
+
+
+def _sandbox_main(
+        connection, name, function_name, max_memory, max_cpu, probes):
+    """Sandboxed child process, send back the sample function run."""
+
+    load_sample(name)
+    _set_limits(max_memory, max_cpu)
+    connection.send(call_sample(name, function_name, probes))
+    connection.close()
+
+
+def call_sandboxed(
+        name, function_name, timeout, max_memory, max_cpu=None,
+        probes=None):
+    """Run a sample function in a child process with resource limits.
+
+    The child gets at most max_memory bytes of address space, max_cpu
+    seconds of CPU time when given, and is killed after timeout seconds.
+    The CPU limit only shows when it is below the timeout.
+
+    """
+
+    started = time.perf_counter()
+    # sandboxes start from threads, never fork a multithreaded process
+    context = multiprocessing.get_context('forkserver')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_sandbox_main, daemon=True, args=(
+            sender, name, function_name, max_memory, max_cpu, probes))
+    process.start()
+    sender.close()
+
+    timed_out = False
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        timed_out = True
+    except EOFError:
+        pass
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+    if timed_out:
+        run = {'status': TIMEOUT, 'error': "no result after {}s".format(
+            timeout)}
+    elif hasattr(signal, 'SIGXCPU') and process.exitcode == -signal.SIGXCPU:
+        run = {'status': CPU_LIMIT, 'error': "more than {}s of CPU".format(
+            max_cpu)}
+    else:
+        run = {'status': CRASHED, 'error': "exit code {}".format(
+            process.exitcode)}
+    run['duration'] = time.perf_counter() - started
+    return run
+
+
+def _init_worker():
+    """Let samples interrupt their worker, even from a background server."""
+
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+
+class SamplePool:
+    """Long-lived worker processes running sample functions for servers.
+
+    Samples signaling or changing their own process never reach the
+    server. Workers keep sample modules imported: the workers are
+    replaced when a sample source changes, or when a worker died.
+
+    """
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.executor = self.make_executor()
+
+    def make_executor(self):
+        """Create the pool of worker processes."""
+        return concurrent.futures.ProcessPoolExecutor(
+            self.jobs, mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker)
+
+    def executor_for(self, name, digest):
+        """Worker pool up to date with the source hash of a sample."""
+        with self.lock:
+            if self.hashes.setdefault(name, digest) != digest:
+                self.executor.shutdown(wait=False)
+                self.executor = self.make_executor()
+                self.hashes = {name: digest}
+            return self.executor
+
+    def replace_broken(self, executor):
+        """Replace a worker pool broken by a dead worker, e.g. OOM killed.
+
+        The pool might already have been replaced by another thread.
+
+        """
+        with self.lock:
+            if self.executor is executor:
+                self.executor.shutdown(wait=False)
+                self.executor = self.make_executor()
+                self.hashes = {}
+
+    def shutdown(self):
+        """Stop the workers once their pending runs are done."""
+        self.executor.shutdown()
+
+
+def run_samples(
+        name, function_names, jobs=1, sandbox=None, probes=None,
+        executor=None):
+    """Run sample functions, yield their runs in the given order.
+
+    sandbox, when given, is a dict of call_sandboxed() limits, timeout,
+    max_memory and max_cpu. probes maps pyhow.probes names to their options.
+    executor, when given, is a long-lived process pool used instead of
+    new worker processes. Without workers nor probes, coroutine
+    functions are awaited together with call_coroutines(). Measured
+    functions are called one by one, so that probes get their first
+    call.
+
+    """
+
+    if sandbox is not None:
+        with concurrent.futures.ThreadPoolExecutor(max(jobs, 1)) as executor:
+            yield from executor.map(
+                lambda function_name: call_sandboxed(
+                    name, function_name, probes=probes, **sandbox),
+                function_names)
+        return
+
+    if executor is not None:
+        yield from executor.map(
+            call_sample, itertools.repeat(name), function_names,
+            itertools.repeat(probes))
+        return
+
+    if jobs <= 1:
+        module = load_sample(name)
+        coroutine_names = [
+            function_name for function_name in function_names
+            if inspect.iscoroutinefunction(getattr(module, function_name))]
+        gathered = {}
+        if len(coroutine_names) > 1 and not probes:
+            gathered = dict(zip(coroutine_names, call_coroutines(
+                name, coroutine_names)))
+        for function_name in function_names:
+            if function_name in gathered:
+                yield gathered[function_name]
+            else:
+                yield call_sample(name, function_name, probes)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(
+            call_sample, itertools.repeat(name), function_names,
+            itertools.repeat(probes))
+
+
+def _stable_run(run):
+    """Part of a run worth storing: no timings, no traceback positions."""
+
+    stable = {
+        key: value for key, value in run.items()
+        if key not in ('duration', 'gather')}
+    if 'exception' in stable:
+        stable['exception'] = dict(stable['exception'], traceback=None)
+    return stable
+
+
+def run_functions(
+        name, sample, function_names, use_cache=True, jobs=1, sandbox=None,
+        probes=None, executor=None):
+    """Run sample functions like run_samples(), reuse stored runs.
+
+    Runs of deterministic functions are stored by syntax tree of the
+    function and of the rest of the module, and by Python version, then
+    reused instead of calling the functions. Reused runs are marked
+    'cached', without duration nor exception traceback. Runs with probe
+    measures are neither reused nor stored.
+
+    """
+
+    functions = {
+        function['name']: function for function in sample['functions']}
+    use_store = use_cache and not probes
+    stored = {}
+    if use_store:
+        for function_name in function_names:
+            if functions[function_name]['deterministic']:
+                run = load_run(sample, functions[function_name])
+                if run is not None:
+                    stored[function_name] = dict(
+                        run, cached=True, duration=None)
+
+    runs = run_samples(
+        name, [
+            function_name for function_name in function_names
+            if function_name not in stored],
+        jobs, sandbox, probes, executor)
+    for function_name in function_names:
+        if function_name in stored:
+            yield stored[function_name]
+            continue
+        run = next(runs)
+        if use_store and functions[function_name]['deterministic'] and (
+                run['status'] in (OK, ERROR)):
+            store_run(sample, functions[function_name], _stable_run(run))
+        yield run
@@ -2,23 +2,6 @@
 
 Contains all the sample codes.
 
-"""
+Sample modules are not imported here, see pyhow.make_samples.
 
-import pyhow.samples.builtin.exceptions
-import pyhow.samples.builtin.objects
-import pyhow.samples.builtin.warnings
-import pyhow.samples.impl.async
-import pyhow.samples.impl.classes
-import pyhow.samples.impl.convertibles
-import pyhow.samples.impl.functions
-import pyhow.samples.impl.operators
-import pyhow.samples.impl.iterables
-import pyhow.samples.impl.metaclasses
-import pyhow.samples.impl.serializables
-import pyhow.samples.lib.collections
-import pyhow.samples.lib.functools
-import pyhow.samples.lib.itertools
-import pyhow.samples.lib.re
-import pyhow.samples.lib.tempfile
-import pyhow.samples.syntax.regex
-import pyhow.samples.syntax.str_format
+"""
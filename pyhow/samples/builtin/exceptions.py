@@ -170,6 +170,7 @@ def blocking_io_error():
         return "read or write failed"
 
 
+# nondeterministic: uses a process pipe
 def broken_pipe_error():
     """Broken pipe."""
     (pipe_end1, pipe_end2) = multiprocessing.Pipe()
@@ -204,6 +205,7 @@ def connection_aborted_error():
         return "connection broken"
 
 
+# nondeterministic: opens sockets
 def connection_error():
     """Base of all connection errors."""
     try:
@@ -212,6 +214,7 @@ def connection_error():
         return "connection not possible"
 
 
+# nondeterministic: opens sockets
 def connection_refused():
     """Connection refused by peer."""
     try:
@@ -220,13 +223,15 @@ def connection_refused():
         return "don't want to connect with you"
 
 
+# nondeterministic: opens sockets
 def connection_reset_error():
     """Connection reseted by peer."""
     server = socket.socket()
-    server.bind(('localhost', 19900))
+    # let the system choose a free port
+    server.bind(('localhost', 0))
     server.listen(0)
     client = socket.socket()
-    client.connect(('localhost', 19900))
+    client.connect(server.getsockname())
     # break the socket
     server.close()
     try:
@@ -345,6 +350,7 @@ def base_exception():
         return "never fail"
 
 
+# nondeterministic: depends on the child processes
 def child_process_error():
     """Unable to access child process."""
     try:
@@ -370,6 +376,7 @@ def interrupted_error():
         return "processing interrupted"
 
 
+# nondeterministic: signals its own process
 def keyborad_interrupt():
     """Process interrupted by exit signal."""
     try:
@@ -415,6 +422,7 @@ def overflow_error():
         return "infinite is too big"
 
 
+# nondeterministic: signals a process
 def process_loockup_error():
     """Manipulating process that doesn't exist."""
     try:
@@ -431,6 +439,7 @@ def runtime_error():
         return "lock before releasing"
 
 
+# nondeterministic: opens a socket
 def system_error():
     """Operating system or Python interpreter failure."""
     try:
@@ -460,6 +469,7 @@ def timeout_error():
 # category: file system
 
 
+# nondeterministic: uses temporary paths
 def environment_error():
     """Base of all file system errors. AKA IOError / OSError."""
     try:
@@ -468,6 +478,7 @@ def environment_error():
         return "removing a directory that doesn't exist"
 
 
+# nondeterministic: uses temporary paths
 def file_exists_error():
     """File already exists."""
     with tempfile.TemporaryDirectory() as dirname:
@@ -477,6 +488,7 @@ def file_exists_error():
             return "creating a directory that already exists"
 
 
+# nondeterministic: uses temporary paths
 def file_not_found_error():
     """File doesn't exist."""
     try:
@@ -485,6 +497,7 @@ def file_not_found_error():
         return "deleting a file that doesn't exist"
 
 
+# nondeterministic: uses temporary paths
 def io_error():
     """Base of all file system errors. AKA EnvironmentError / OSError."""
     try:
@@ -493,6 +506,7 @@ def io_error():
         return "reading a missing file"
 
 
+# nondeterministic: uses temporary paths
 def is_a_directory_error():
     """Wrong usage of a directory."""
     with tempfile.TemporaryDirectory() as dirname:
@@ -502,6 +516,7 @@ def is_a_directory_error():
             return "reading a directory as a file"
 
 
+# nondeterministic: uses temporary paths
 def not_a_directory_error():
     """Try to use a nondirectory as a directory."""
     file_descriptor, filename = tempfile.mkstemp()
@@ -514,6 +529,7 @@ def not_a_directory_error():
         os.remove(filename)
 
 
+# nondeterministic: uses temporary paths
 def permission_error():
     """No permission to process a file or directory."""
     file_descriptor, filename = tempfile.mkstemp()
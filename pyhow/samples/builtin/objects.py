@@ -101,6 +101,7 @@ def float_builtin():
     return float('inf')
 
 
+# nondeterministic: set ordering depends on string hashing
 def frozenset_builtin():
     """frozenset: Immutable items set."""
 
@@ -317,6 +318,7 @@ def format_builtin():
     return "{} ready".format(format(1, '.0%'))
 
 
+# nondeterministic: string hashing is randomized
 def hash_builtin():
     """hash: Hashed integer value of an object."""
 
@@ -329,6 +331,7 @@ def hex_builtin():
     return "R{}nne".format(hex(10))
 
 
+# nondeterministic: object ids change between runs
 def id_builtin():
     """id: Get the unique ID of an object."""
 
@@ -343,6 +346,7 @@ def oct_builtin():
     return "fish ~({})~".format(oct(0))
 
 
+# nondeterministic: uses a temporary file
 def open_builtin():
     """open: Open a file."""
 
@@ -439,6 +443,7 @@ def locals_builtin():
     return locals()['dynamite']
 
 
+# nondeterministic: keyed by object ids
 def property_builtin():
     """property: Define getter setter and deleter for an attribute."""
 
@@ -496,6 +501,7 @@ def staticmethod_builtin():
     return Words.last("Bond, James Bond", ",")
 
 
+# nondeterministic: object ids change between runs
 def super_builtin():
     """super: Access base classes methods."""
 
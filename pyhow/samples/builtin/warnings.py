@@ -84,6 +84,7 @@ def warning():
 # category: usage of unsafe features
 
 
+# nondeterministic: starts a process
 def deprecatioin_warning():
     """Using depreticated features."""
 
@@ -1,39 +1,99 @@
 """Handle asynchronious operations."""
 
+import asyncio
 
-# category: asynchronious operations
+from pyhow import sample
 
+# using unfinished example classes
+# pylint: disable=too-few-public-methods
 
-def aenter():
-    """__aenter__: Todo."""
+# Coroutine samples are declared nondeterministic: they always run, so
+# that pages show the wall time of the coroutines awaited together.
 
-    # TODO: async with, new in python 3.5
-    return NotImplemented
 
+@sample(category='asynchronious operations', deterministic=False)
+async def aenter():
+    """__aenter__, async with: Enter an asynchronous context."""
 
-def aexit():
-    """__aexit__: Todo."""
+    class _Restaurant:
+        async def __aenter__(self):
+            await asyncio.sleep(0.02)
+            return "table booked"
 
-    # TODO: async with, new in python 3.5
-    return NotImplemented
+        async def __aexit__(self, exc_type, exc_value, traceback):
+            return False
 
+    async with _Restaurant() as booking:
+        return booking
 
-def aiter():
-    """__aiter__: Todo."""
 
-    # TODO: async for, new in python 3.5
-    return NotImplemented
+@sample(category='asynchronious operations', deterministic=False)
+async def aexit():
+    """__aexit__, async with: Leave an asynchronous context."""
 
+    class _Restaurant:
+        def __init__(self):
+            self.cleaned = False
 
-def anext():
-    """__anext__: Todo."""
+        async def __aenter__(self):
+            return self
 
-    # TODO: async for, new in python 3.5
-    return NotImplemented
+        async def __aexit__(self, exc_type, exc_value, traceback):
+            await asyncio.sleep(0.02)
+            self.cleaned = True
+            # swallow the exception
+            return exc_type is ValueError
 
+    restaurant = _Restaurant()
+    async with restaurant:
+        raise ValueError("coffee spilled")
+    return restaurant.cleaned and "table cleaned anyway"
 
-def await_handler():
-    """__await__: Todo."""
 
-    # TODO: async def, new in python 3.5
-    return NotImplemented
+@sample(category='asynchronious operations', deterministic=False)
+async def aiter():
+    """__aiter__, async for: Create an asynchronous iterator."""
+
+    class _Playlist:
+        def __aiter__(self):
+            return self._play()
+
+        async def _play(self):
+            for song in ("intro", "verse", "chorus"):
+                await asyncio.sleep(0.01)
+                yield song
+
+    return [song async for song in _Playlist()]
+
+
+@sample(category='asynchronious operations', deterministic=False)
+async def anext():
+    """__anext__, async for: Get one item of an asynchronous iterator."""
+
+    class _Countdown:
+        def __init__(self):
+            self._count = 3
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if not self._count:
+                raise StopAsyncIteration()
+            await asyncio.sleep(0.01)
+            self._count -= 1
+            return self._count
+
+    return [count async for count in _Countdown()]
+
+
+@sample(category='asynchronious operations', deterministic=False)
+async def await_handler():
+    """__await__, await: Create an awaitable object."""
+
+    class _Delivery:
+        def __await__(self):
+            yield from asyncio.sleep(0.02).__await__()
+            return "pizza delivered"
+
+    return await _Delivery()
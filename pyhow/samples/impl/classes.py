@@ -264,6 +264,7 @@ def del_method():
     return context
 
 
+# nondeterministic: object ids change between runs
 def dict_attribute():
     """Cls.__dict__: Bindings for class members."""
 
@@ -13,6 +13,7 @@ def mktemp():
     return "forget me..."
 
 
+# nondeterministic: temporary names change between runs
 def mkstemp():
     """Unique temporary file. Not deleted on close."""
 
@@ -24,6 +25,7 @@ def mkstemp():
     return created and "filename {}".format(filename)
 
 
+# nondeterministic: temporary names change between runs
 def named_temporary_file():
     """Unique temporary file. Delete on close."""
 
@@ -33,6 +35,7 @@ def named_temporary_file():
         return created and "filename {}".format(temp_file.name)
 
 
+# nondeterministic: file descriptors change between runs
 def spooled_temporary_file():
     """Unique temporary file, data on disc or memory. Delete on close."""
 
@@ -49,6 +52,7 @@ def spooled_temporary_file():
             "fileno {}, in-memory limit {}".format(temp_file.name, max_size))
 
 
+# nondeterministic: file descriptors change between runs
 def temporary_file():
     """Unique anonymous temporary file. Delete on close."""
 
@@ -60,6 +64,7 @@ def temporary_file():
 # category: temporary directories
 
 
+# nondeterministic: temporary root depends on the environment
 def gettempdir():
     """Temporary items root directory."""
 
@@ -72,6 +77,7 @@ def gettempprefix():
     return "prefix is {}".format(tempfile.gettempprefix())
 
 
+# nondeterministic: temporary names change between runs
 def mkdtemp():
     """Unique temporary directory."""
 
@@ -82,6 +88,7 @@ def mkdtemp():
     return created and "directory {}".format(dirname)
 
 
+# nondeterministic: temporary names change between runs
 def temporary_directory():
     """Unique temporary directory info. Delete on close."""
 
@@ -90,6 +97,7 @@ def temporary_directory():
         return created and "directory {}".format(dirname)
 
 
+# nondeterministic: temporary root depends on the environment
 def tempdir():
     """Set the temprary items root directory."""
 
@@ -0,0 +1,131 @@
+"""pyhow.search module
+
+Find sample functions from words of their names, docstrings, categories
+and code, with an inverted index stored in the cache.
+
+"""
+
+import bisect
+import collections
+import math
+import re
+
+from pyhow.cache import (
+    CACHE_VERSION, cached_extract_sample, read_json, write_json)
+from pyhow.manifest import installed_samples_filename, load_manifest
+
+
+INDEX_VERSION = 1
+
+# documents come from extracted data: rebuilt with each cache version
+_STORED_VERSION = [CACHE_VERSION, INDEX_VERSION]
+
+# weight of a word found in each part of a sample function
+FIELD_WEIGHTS = (
+    ('name', 5),
+    ('category', 3),
+    ('doc', 2),
+    ('module', 1),
+    ('code', 1),
+)
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _words(text):
+    """Lowercase words of a text, identifiers are split on underscores."""
+
+    return _WORD.findall(text.lower())
+
+
+def build_index(manifest):
+    """Index the functions of all samples: postings of each word.
+
+    Postings map each word to [document number, weight] pairs, documents
+    are [module:function, docstring] pairs.
+
+    """
+
+    documents = []
+    postings = collections.defaultdict(list)
+    for name, entry in sorted(manifest.items()):
+        sample = cached_extract_sample(entry['filename'])
+        for function in sample['functions']:
+            fields = {
+                'name': function['name'],
+                'category': function['category'],
+                'doc': function['doc'],
+                'module': name,
+                'code': ''.join(function['codelines']),
+            }
+            weights = collections.Counter()
+            for field, weight in FIELD_WEIGHTS:
+                for word in _words(fields[field]):
+                    weights[word] += weight
+            for word, weight in weights.items():
+                postings[word].append([len(documents), weight])
+            documents.append(
+                ['{}:{}'.format(name, function['name']), function['doc']])
+
+    return {
+        'version': _STORED_VERSION,
+        'mtimes': {
+            name: entry['mtime'] for name, entry in manifest.items()},
+        'documents': documents,
+        'postings': postings,
+    }
+
+
+def load_index():
+    """Load the search index, rebuild it when sample files changed."""
+
+    manifest = load_manifest()
+    filename = installed_samples_filename('search-index')
+    index = read_json(filename)
+    if not index or index.get('version') != _STORED_VERSION or (
+            index['mtimes'] != {
+                name: entry['mtime'] for name, entry in manifest.items()}):
+        index = build_index(manifest)
+        write_json(filename, index)
+    return index
+
+
+def search(index, terms, limit=10):
+    """Rank the functions matching all the terms, best first.
+
+    Terms also match the words they start, e.g. 'ref' matches 'reference',
+    with half the score of an exact match. Return (score, module:function,
+    docstring) tuples.
+
+    """
+
+    vocabulary = sorted(index['postings'])
+    nb_documents = len(index['documents'])
+    scores = None
+    for term in terms:
+        term_scores = collections.Counter()
+        for word in _words(term):
+            position = bisect.bisect_left(vocabulary, word)
+            for indexed_word in vocabulary[position:]:
+                if not indexed_word.startswith(word):
+                    break
+                postings = index['postings'][indexed_word]
+                idf = math.log(nb_documents / len(postings)) + 1
+                if indexed_word != word:
+                    idf /= 2
+                for document, weight in postings:
+                    term_scores[document] += weight * idf
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = collections.Counter({
+                document: score + term_scores[document]
+                for document, score in scores.items()
+                if document in term_scores})
+
+    ranked = sorted(
+        (scores or {}).items(), key=lambda item: (-item[1], item[0]))
+    return [
+        (score, index['documents'][document][0],
+         index['documents'][document][1])
+        for document, score in ranked[:limit]]
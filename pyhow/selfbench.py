@@ -0,0 +1,145 @@
+"""pyhow.selfbench module
+
+Benchmark the pyhow pipeline, stage by stage, and compare the timings
+with a saved baseline.
+
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+from pyhow import render_page
+from pyhow.cache import cached_extract_sample
+from pyhow.extract import extract_sample
+from pyhow.registry import load_sample, make_samples, sample_module_name
+from pyhow.runner import run_samples
+
+
+BASELINE_VERSION = 2
+
+ALL_SAMPLES = '*'
+
+# nothing from pyhow is imported before the timer starts
+_IMPORT_SCRIPT = """
+import importlib
+import time
+started = time.perf_counter()
+importlib.import_module({module!r})
+print(time.perf_counter() - started)
+"""
+
+
+def _best_time(function, repeat):
+    """Shortest duration of a function call, in seconds."""
+
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return min(durations)
+
+
+def _cold_import_time(module, repeat):
+    """Shortest duration of a module import in a fresh interpreter."""
+
+    return min(
+        float(subprocess.check_output([
+            sys.executable, '-c', _IMPORT_SCRIPT.format(module=module)]))
+        for _ in range(repeat))
+
+
+def _command_time(arguments, repeat):
+    """Shortest duration of a pyhow command line run, in a new process."""
+
+    return _best_time(lambda: subprocess.run(
+        [sys.executable, '-m', 'pyhow'] + arguments, check=True,
+        stdout=subprocess.DEVNULL), repeat)
+
+
+def run_selfbench(repeat=5):
+    """Time each stage of the pipeline for all samples, in seconds.
+
+    The startup stage times importing pyhow and showing the command line
+    help, both in new processes.
+
+    """
+
+    stages = {
+        'startup': {}, 'import': {}, 'discover': {}, 'extract': {},
+        'extract_cached': {}, 'execute': {}, 'render': {}}
+
+    stages['startup']['import pyhow'] = _cold_import_time('pyhow', repeat)
+    stages['startup']['pyhow -h'] = _command_time(['-h'], repeat)
+    stages['discover'][ALL_SAMPLES] = _best_time(make_samples, repeat)
+    for name, filename in sorted(make_samples().items()):
+        stages['import'][name] = _cold_import_time(
+            sample_module_name(name), repeat)
+        load_sample(name)
+
+        stages['extract'][name] = _best_time(
+            lambda: extract_sample(filename), repeat)
+        cached_extract_sample(filename)
+        stages['extract_cached'][name] = _best_time(
+            lambda: cached_extract_sample(filename), repeat)
+
+        sample = extract_sample(filename)
+        function_names = [
+            function['name'] for function in sample['functions']]
+        stages['execute'][name] = _best_time(
+            lambda: list(run_samples(name, function_names)), repeat)
+
+        runs = dict(zip(function_names, run_samples(name, function_names)))
+        stages['render'][name] = _best_time(
+            lambda: ''.join(render_page(sample, runs)), repeat)
+
+    return {
+        'version': BASELINE_VERSION,
+        'python': sys.version,
+        'stages': stages,
+    }
+
+
+def compare_selfbench(baseline, current, threshold):
+    """Find timings slower than the baseline by more than threshold.
+
+    Return (stage, sample, baseline, current) tuples, stage totals use
+    ALL_SAMPLES as sample name.
+
+    """
+
+    regressions = []
+    for stage, timings in sorted(current['stages'].items()):
+        baseline_timings = baseline['stages'].get(stage, {})
+        compared = [
+            (sample, baseline_timings[sample], timing)
+            for sample, timing in sorted(timings.items())
+            if sample in baseline_timings]
+        if len(compared) > 1:
+            compared.append((
+                ALL_SAMPLES, sum(item[1] for item in compared),
+                sum(item[2] for item in compared)))
+        regressions.extend(
+            (stage, sample, baseline_timing, timing)
+            for sample, baseline_timing, timing in compared
+            if timing > baseline_timing * (1 + threshold))
+    return regressions
+
+
+def load_baseline(filename):
+    """Load a saved baseline."""
+
+    with open(filename, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError("unsupported baseline version")
+    return baseline
+
+
+def save_baseline(filename, results):
+    """Save timings as a baseline."""
+
+    with open(filename, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
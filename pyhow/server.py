@@ -0,0 +1,137 @@
+"""pyhow.server module
+
+Long-lived pyhow process rendering samples for the command line over a
+Unix socket, with pyhow and the sample modules already imported.
+
+Clients send one JSON line {'name', 'output', 'options'} where options
+are render_sample() or render_records() keyword arguments. The server
+answers with {'chunk': text} JSON lines, then {'done': true, 'profiles':
+saved pstats files}, or {'error': message} when rendering failed.
+Requests are checked against the samples manifest first, unknown sample
+functions are answered with {'invalid': message}. pyhow.client sends
+the requests.
+
+"""
+
+import concurrent.futures
+import json
+import os
+import signal
+import socketserver
+
+from pyhow import NDJSON, render_records, render_sample
+from pyhow.cache import cached_extract_sample
+from pyhow.client import ServerError, connect, private_directory
+from pyhow.manifest import check_address, load_manifest
+from pyhow.registry import sample_filename
+from pyhow.runner import SamplePool
+
+
+def _stop(signum, frame):
+    """Stop serving on termination requests."""
+
+    raise SystemExit(0)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Render the requested sample, stream it back chunk by chunk."""
+
+    def send(self, message):
+        """Write a JSON line message to the client."""
+        self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            line = self.rfile.readline()
+            if not line:
+                # connection probe, e.g. from serve() on the same socket
+                return
+            request = json.loads(line.decode('utf-8'))
+            try:
+                check_address(
+                    load_manifest(), request['name'],
+                    request['options'].get('selection'),
+                    request['options'].get('categories'))
+            except ValueError as error:
+                self.send({'invalid': str(error)})
+                return
+            render = render_sample
+            if request['output'] == NDJSON:
+                render = render_records
+            profiles = []
+            executor = self.server.executor_for(request['name'])
+            chunks = render(
+                request['name'], executor=executor, profiles=profiles,
+                **request['options'])
+            for chunk in chunks:
+                self.send({'chunk': chunk})
+            self.send({'done': True, 'profiles': profiles})
+        except (BrokenPipeError, ConnectionResetError):
+            # the client went away, e.g. its pager was closed
+            return
+        except concurrent.futures.BrokenExecutor as error:
+            # a worker died: new workers for the next requests
+            self.server.pool.replace_broken(executor)
+            self.send({'error': '{}: {}'.format(type(error).__name__, error)})
+        except Exception as error:
+            self.send({'error': '{}: {}'.format(type(error).__name__, error)})
+
+
+class SampleServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server rendering samples in concurrent threads.
+
+    Sample functions run in a pyhow.runner.SamplePool.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, jobs=None):
+        super().__init__(socket_path, _RequestHandler)
+        self.pool = SamplePool(jobs)
+
+    def executor_for(self, name):
+        """Worker pool up to date with the current source of a sample."""
+        digest = cached_extract_sample(sample_filename(name))['hash']
+        return self.pool.executor_for(name, digest)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+
+def serve(socket_path, jobs=None):
+    """Serve samples on a Unix socket until interrupted.
+
+    The socket directory is created if needed, and must be private to
+    the current user, see pyhow.client.private_directory().
+
+    """
+
+    os.makedirs(
+        os.path.dirname(os.path.abspath(socket_path)), mode=0o700,
+        exist_ok=True)
+    if not private_directory(socket_path):
+        raise ServerError(
+            "{} must be a directory owned by the current user, with mode "
+            "0700".format(os.path.dirname(os.path.abspath(socket_path))))
+    connection = connect(socket_path)
+    if connection is not None:
+        connection.close()
+        raise ServerError("a server already listens on {}".format(
+            socket_path))
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = SampleServer(socket_path, jobs)
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            # already removed, e.g. by a newer server on the same path
+            pass
@@ -0,0 +1,63 @@
+"""pyhow.style module
+
+Text styles: plain text, ANSI escape sequences or overstriking.
+
+"""
+
+import collections
+
+
+PLAIN = 'plain'
+ANSI = 'ansi'
+OVERSTRIKE = 'overstrike'
+
+Style = collections.namedtuple('Style', ['bold', 'underline'])
+
+
+class _OverstrikeTable(dict):
+    """str.translate table, overstrikes each character once and for all."""
+
+    def __init__(self, template):
+        super().__init__()
+        self.template = template
+
+    def __missing__(self, code):
+        self[code] = self.template.format(chr(code))
+        return self[code]
+
+
+_OVERSTRIKE_BOLD = _OverstrikeTable('{0}\b{0}')
+
+_OVERSTRIKE_UNDERLINE = _OverstrikeTable('_\b{0}')
+
+
+def _plain(text):
+    """Leave a string as it is."""
+    return text
+
+
+def _ansi_bold(text):
+    """Format a string in bold with an escape sequence."""
+    return '\x1b[1m' + text + '\x1b[0m'
+
+
+def _ansi_underline(text):
+    """Format a string underlined with an escape sequence."""
+    return '\x1b[4m' + text + '\x1b[0m'
+
+
+def _overstrike_bold(text):
+    """Format a string in bold by overstriking."""
+    return text.translate(_OVERSTRIKE_BOLD)
+
+
+def _overstrike_underline(text):
+    """Format a string by overstriking."""
+    return text.translate(_OVERSTRIKE_UNDERLINE)
+
+
+STYLES = collections.OrderedDict([
+    (PLAIN, Style(_plain, _plain)),
+    (ANSI, Style(_ansi_bold, _ansi_underline)),
+    (OVERSTRIKE, Style(_overstrike_bold, _overstrike_underline)),
+])
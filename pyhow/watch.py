@@ -0,0 +1,145 @@
+"""pyhow.watch module
+
+Render a sample again each time its file is saved, only running the
+functions whose syntax tree changed since the previous render.
+
+"""
+
+import ctypes
+import ctypes.util
+import importlib
+import os
+import select
+import sys
+import time
+
+from pyhow import render_page
+from pyhow.cache import cached_extract_sample
+from pyhow.extract import select_functions
+from pyhow.registry import load_sample, sample_filename
+from pyhow.runner import run_functions
+
+
+# inotify events of a file written in place or replaced by an editor
+_IN_CLOSE_WRITE = 0x08
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+
+_CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+class _Poller:
+    """Wait for file changes by polling."""
+
+    def wait(self, timeout):
+        """Wait timeout seconds."""
+        time.sleep(timeout)
+
+    def close(self):
+        """Release the poller resources."""
+
+
+class _Inotify(_Poller):
+    """Wait for file changes in a directory with Linux inotify."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.file_descriptor = libc.inotify_init1(os.O_CLOEXEC)
+        if self.file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(
+                self.file_descriptor, os.fsencode(directory),
+                _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE) < 0:
+            os.close(self.file_descriptor)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout):
+        """Wait for a directory event, at most timeout seconds."""
+        readable, _, _ = select.select(
+            [self.file_descriptor], [], [], timeout)
+        if readable:
+            os.read(self.file_descriptor, 4096)
+
+    def close(self):
+        """Stop watching the directory."""
+        os.close(self.file_descriptor)
+
+
+def _make_waiter(filename):
+    """inotify waiter of a file when available, poller otherwise."""
+
+    if sys.platform.startswith('linux'):
+        try:
+            return _Inotify(os.path.dirname(os.path.abspath(filename)))
+        except (AttributeError, OSError, TypeError):
+            pass
+    return _Poller()
+
+
+def _file_state(filename):
+    """Size and modification time of a file, None when missing."""
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def watch_sample(name, write, style, selection=None, interval=1):
+    """Render a sample at each change of its file, until interrupted.
+
+    Functions keep their previous run unless their syntax tree or the
+    rest of the module changed. Nondeterministic functions always run.
+
+    """
+
+    filename = sample_filename(name)
+    waiter = _make_waiter(filename)
+    previous_sample = None
+    runs = {}
+    state = None
+    try:
+        while True:
+            if _file_state(filename) == state:
+                waiter.wait(interval)
+                continue
+            state = _file_state(filename)
+            try:
+                sample = cached_extract_sample(filename)
+            except (OSError, SyntaxError, ValueError) as error:
+                write("{}: {}\n".format(type(error).__name__, error))
+                continue
+            if selection is not None:
+                sample = dict(sample, functions=select_functions(
+                    sample['functions'], selection))
+
+            previous_hashes = {}
+            if previous_sample is not None and (
+                    previous_sample['context_hash'] ==
+                    sample['context_hash']):
+                previous_hashes = {
+                    function['name']: function['code_hash']
+                    for function in previous_sample['functions']}
+            changed = [
+                function['name'] for function in sample['functions']
+                if not function['deterministic'] or
+                function['name'] not in runs or
+                previous_hashes.get(function['name']) !=
+                function['code_hash']]
+            try:
+                if previous_sample is not None and changed:
+                    importlib.reload(load_sample(name))
+                runs.update(zip(changed, run_functions(name, sample, changed)))
+            except Exception as error:
+                write("{}: {}\n".format(type(error).__name__, error))
+                continue
+            previous_sample = sample
+
+            write(_CLEAR_SCREEN if sys.stdout.isatty() else "\n")
+            for chunk in render_page(sample, runs, style):
+                write(chunk)
+            write("{}: {} functions run, {} reused\n".format(
+                name, len(changed), len(sample['functions']) - len(changed)))
+    finally:
+        waiter.close()
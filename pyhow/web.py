@@ -0,0 +1,194 @@
+"""pyhow.web module
+
+HTTP server of sample pages, as HTML, JSON or plain text, for whole
+modules or module:function addresses, e.g. /lib.re:group*.json.
+
+Pages of deterministic functions get an ETag from the sample source
+hash and stay in an in-memory LRU cache. Extraction runs in threads and
+sample functions in worker processes, never in the event loop.
+
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import http
+import json
+import signal
+import sys
+import urllib.parse
+
+from pyhow import run_record
+from pyhow.cache import cached_extract_sample
+from pyhow.export import EXPORT_FORMATS, run_module
+from pyhow.extract import group_by_category, select_functions
+from pyhow.manifest import load_manifest
+from pyhow.registry import parse_address
+from pyhow.runner import SamplePool
+
+
+PAGE_CACHE_SIZE = 128
+
+DEFAULT_FORMAT = 'html'
+
+
+def _json_page(name, sample, runs):
+    """JSON page of a sample module: the list of its function runs."""
+
+    return json.dumps([
+        run_record(name, function, runs[function['name']])
+        for _, functions in group_by_category(sample['functions'])
+        for function in functions])
+
+
+WEB_FORMATS = {
+    'html': ('text/html; charset=utf-8', EXPORT_FORMATS['html'][1]),
+    'json': ('application/json', _json_page),
+    'txt': ('text/plain; charset=utf-8', EXPORT_FORMATS['txt'][1]),
+}
+
+
+def _split_path(path):
+    """Split a request path into a sample address and a page format."""
+
+    path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+    address, _, extension = path.lstrip('/').rpartition('.')
+    if extension not in WEB_FORMATS:
+        return path.lstrip('/'), DEFAULT_FORMAT
+    return address, extension
+
+
+class SampleWebServer:
+    """Render sample pages for HTTP requests."""
+
+    def __init__(self, jobs=None, cache_size=PAGE_CACHE_SIZE):
+        self.samples = load_manifest()
+        self.pool = SamplePool(jobs)
+        self.pages = collections.OrderedDict()
+        self.cache_size = cache_size
+
+    def index(self):
+        """HTML index of the samples."""
+        return EXPORT_FORMATS['html'][2]([
+            {'name': name, 'filename': name, 'doc': entry['doc']}
+            for name, entry in sorted(self.samples.items())])
+
+    async def render(self, address, page_format, etags):
+        """Answer a page request: status, headers and body."""
+        name, pattern = parse_address(address)
+        if name not in self.samples:
+            return http.HTTPStatus.NOT_FOUND, {}, b"unknown sample\n"
+
+        loop = asyncio.get_running_loop()
+        sample = await loop.run_in_executor(
+            None, cached_extract_sample, self.samples[name]['filename'])
+        if pattern is not None:
+            sample = dict(sample, functions=select_functions(
+                sample['functions'], [pattern]))
+            if not sample['functions']:
+                return http.HTTPStatus.NOT_FOUND, {}, b"unknown function\n"
+
+        content_type, render_page = WEB_FORMATS[page_format]
+        headers = {'Content-Type': content_type}
+        cacheable = all(
+            function['deterministic'] for function in sample['functions'])
+        etag = '"{}"'.format(hashlib.sha1(json.dumps(
+            [sample['hash'], sys.version, address, page_format]
+        ).encode('utf-8')).hexdigest())
+        if cacheable:
+            headers['ETag'] = etag
+            if etag in etags:
+                return http.HTTPStatus.NOT_MODIFIED, headers, b""
+            if etag in self.pages:
+                self.pages.move_to_end(etag)
+                return http.HTTPStatus.OK, headers, self.pages[etag]
+        else:
+            headers['Cache-Control'] = 'no-store'
+
+        executor = self.pool.executor_for(name, sample['hash'])
+        try:
+            runs = await loop.run_in_executor(
+                executor, run_module, name, sample)
+        except concurrent.futures.BrokenExecutor:
+            # a worker died: new workers for the next requests
+            self.pool.replace_broken(executor)
+            raise
+        body = render_page(name, sample, runs).encode('utf-8')
+        if cacheable:
+            self.pages[etag] = body
+            while len(self.pages) > self.cache_size:
+                self.pages.popitem(last=False)
+        return http.HTTPStatus.OK, headers, body
+
+    async def respond(self, method, path, request_headers):
+        """Answer a request: status, headers and body."""
+        if method not in ('GET', 'HEAD'):
+            return http.HTTPStatus.METHOD_NOT_ALLOWED, {}, b""
+        address, page_format = _split_path(path)
+        if address in ('', 'index'):
+            return http.HTTPStatus.OK, {
+                'Content-Type': WEB_FORMATS['html'][0]}, self.index().encode(
+                    'utf-8')
+        etags = [
+            etag.strip() for etag in request_headers.get(
+                'if-none-match', '').split(',')]
+        return await self.render(address, page_format, etags)
+
+    async def handle(self, reader, writer):
+        """Read one HTTP request, write its response."""
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            request_headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if not line.strip():
+                    break
+                key, _, value = line.partition(':')
+                request_headers[key.strip().lower()] = value.strip()
+
+            method, path = (request_line.split() + ['', ''])[:2]
+            try:
+                status, headers, body = await self.respond(
+                    method, path, request_headers)
+            except Exception as error:
+                status, headers, body = (
+                    http.HTTPStatus.INTERNAL_SERVER_ERROR, {},
+                    '{}: {}\n'.format(type(error).__name__, error).encode(
+                        'utf-8'))
+            print('{} {} {}'.format(method, path, status.value),
+                  file=sys.stderr)
+
+            headers.setdefault('Content-Type', 'text/plain; charset=utf-8')
+            headers.update({
+                'Content-Length': str(len(body)), 'Connection': 'close'})
+            writer.write('HTTP/1.1 {} {}\r\n{}\r\n'.format(
+                status.value, status.phrase, ''.join(
+                    '{}: {}\r\n'.format(key, value)
+                    for key, value in headers.items())).encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        """Serve HTTP requests until cancelled or terminated."""
+        server = await asyncio.start_server(self.handle, host, port)
+        loop = asyncio.get_running_loop()
+        terminated = loop.create_future()
+        loop.add_signal_handler(
+            signal.SIGTERM, terminated.set_result, None)
+        try:
+            async with server:
+                await terminated
+        finally:
+            self.pool.shutdown()
+
+
+def serve_http(host='localhost', port=8000, jobs=None):
+    """Serve sample pages over HTTP until interrupted."""
+
+    asyncio.run(SampleWebServer(jobs).serve(host, port))
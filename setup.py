@@ -11,6 +11,7 @@ setup(
     license="MIT",
     description="Master all the bases of python!",
     packages=find_packages(),
+    python_requires=">=3.8",
     entry_points={
         'console_scripts': ['pyhow = pyhow.__main__:main']
     },